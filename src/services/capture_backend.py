@@ -0,0 +1,298 @@
+"""
+Screen capture backends with persistent device resources and reusable frame buffers
+"""
+import ctypes
+from ctypes import wintypes
+import logging
+import sys
+import threading
+import numpy as np
+
+try:
+    import win32gui
+    import win32ui
+    import win32con
+except ImportError:
+    win32gui = win32ui = win32con = None
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+logger = logging.getLogger(__name__)
+
+DIB_RGB_COLORS = 0
+BI_RGB = 0
+
+
+class _BitmapInfoHeader(ctypes.Structure):
+    _fields_ = [
+        ("biSize", ctypes.c_uint32),
+        ("biWidth", ctypes.c_int32),
+        ("biHeight", ctypes.c_int32),
+        ("biPlanes", ctypes.c_uint16),
+        ("biBitCount", ctypes.c_uint16),
+        ("biCompression", ctypes.c_uint32),
+        ("biSizeImage", ctypes.c_uint32),
+        ("biXPelsPerMeter", ctypes.c_int32),
+        ("biYPelsPerMeter", ctypes.c_int32),
+        ("biClrUsed", ctypes.c_uint32),
+        ("biClrImportant", ctypes.c_uint32),
+    ]
+
+
+class _BitmapInfo(ctypes.Structure):
+    _fields_ = [("bmiHeader", _BitmapInfoHeader), ("bmiColors", ctypes.c_uint32 * 3)]
+
+
+if sys.platform == "win32":
+    # Without a prototype ctypes passes handles as C ints, which overflow on 64-bit Windows
+    GetDIBits = ctypes.windll.gdi32.GetDIBits
+    GetDIBits.argtypes = [
+        wintypes.HDC,
+        wintypes.HBITMAP,
+        wintypes.UINT,
+        wintypes.UINT,
+        ctypes.c_void_p,
+        ctypes.POINTER(_BitmapInfo),
+        wintypes.UINT
+    ]
+    GetDIBits.restype = ctypes.c_int
+else:
+    GetDIBits = None
+
+
+class FrameRing:
+    """Preallocated ring of RGB frame buffers reused between captures"""
+    def __init__(self, depth=3):
+        self.depth = max(1, depth)
+        self.shape = None
+        self.buffers = []
+        self.index = 0
+
+    def next_buffer(self, width, height):
+        """Return the next buffer, reallocating the ring only when the frame size changes"""
+        shape = (height, width, 3)
+        if shape != self.shape:
+            self.buffers = [np.empty(shape, dtype=np.uint8) for _ in range(self.depth)]
+            self.shape = shape
+            self.index = 0
+
+        buffer = self.buffers[self.index]
+        self.index = (self.index + 1) % self.depth
+        return buffer
+
+
+class CaptureBackend:
+    """Base class for screen capture backends
+
+    Backends keep their platform resources open between grabs and write every
+    frame into a ring of preallocated buffers. A returned frame stays valid
+    until ``ring_depth`` further grabs have been made; callers that keep a frame
+    longer than that must copy it. ``captures_layered_windows`` tells whether
+    semi-transparent windows, such as the capture window, end up in frames.
+    """
+    name = "base"
+    captures_layered_windows = False
+
+    def __init__(self, ring_depth=3):
+        self.ring = FrameRing(ring_depth)
+        self.lock = threading.Lock()
+
+    def open(self):
+        """Acquire platform resources"""
+
+    def close(self):
+        """Release platform resources"""
+
+    def grab(self, x, y, width, height):
+        """Capture a screen region as an RGB uint8 array of shape (height, width, 3)"""
+        with self.lock:
+            buffer = self.ring.next_buffer(width, height)
+            self._grab_into(buffer, x, y, width, height)
+            return buffer
+
+    def _grab_into(self, buffer, x, y, width, height):
+        raise NotImplementedError
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Win32CaptureBackend(CaptureBackend):
+    """GDI backend that keeps the desktop DC, memory DC and bitmap alive between frames"""
+    name = "win32"
+
+    def __init__(self, ring_depth=3):
+        super().__init__(ring_depth)
+        if win32gui is None:
+            raise RuntimeError("pywin32 is required for the win32 capture backend")
+        self.hwin = None
+        self.hwindc = None
+        self.srcdc = None
+        self.memdc = None
+        self.bmp = None
+        self.size = None
+        self.staging = None
+        self.bmi = None
+
+    def open(self):
+        """Create the desktop and memory device contexts"""
+        if self.srcdc is not None:
+            return
+        self.hwin = win32gui.GetDesktopWindow()
+        self.hwindc = win32gui.GetWindowDC(self.hwin)
+        self.srcdc = win32ui.CreateDCFromHandle(self.hwindc)
+        self.memdc = self.srcdc.CreateCompatibleDC()
+
+    def close(self):
+        """Release the bitmap and device contexts"""
+        with self.lock:
+            self._release_bitmap()
+            if self.memdc is not None:
+                self.memdc.DeleteDC()
+                self.memdc = None
+            if self.srcdc is not None:
+                self.srcdc.DeleteDC()
+                self.srcdc = None
+            if self.hwindc is not None:
+                win32gui.ReleaseDC(self.hwin, self.hwindc)
+                self.hwindc = None
+
+    def _release_bitmap(self):
+        if self.bmp is not None:
+            win32gui.DeleteObject(self.bmp.GetHandle())
+            self.bmp = None
+            self.size = None
+
+    def _ensure_bitmap(self, width, height):
+        """(Re)create the compatible bitmap and staging buffer when the region size changes"""
+        if self.size == (width, height):
+            return
+        self._release_bitmap()
+        self.bmp = win32ui.CreateBitmap()
+        self.bmp.CreateCompatibleBitmap(self.srcdc, width, height)
+        self.memdc.SelectObject(self.bmp)
+        self.size = (width, height)
+
+        self.staging = np.empty((height, width, 4), dtype=np.uint8)
+        self.bmi = _BitmapInfo()
+        self.bmi.bmiHeader.biSize = ctypes.sizeof(_BitmapInfoHeader)
+        self.bmi.bmiHeader.biWidth = width
+        self.bmi.bmiHeader.biHeight = -height  # Negative height gives a top-down DIB
+        self.bmi.bmiHeader.biPlanes = 1
+        self.bmi.bmiHeader.biBitCount = 32
+        self.bmi.bmiHeader.biCompression = BI_RGB
+
+    def _grab_into(self, buffer, x, y, width, height):
+        self.open()
+        self._ensure_bitmap(width, height)
+        self.memdc.BitBlt((0, 0), (width, height), self.srcdc, (x, y), win32con.SRCCOPY)
+
+        # Read the bits straight into the staging array instead of a new bytes object
+        lines = GetDIBits(
+            self.memdc.GetSafeHdc(),
+            self.bmp.GetHandle(),
+            0,
+            height,
+            ctypes.c_void_p(self.staging.ctypes.data),
+            ctypes.byref(self.bmi),
+            DIB_RGB_COLORS
+        )
+        if lines != height:
+            raise OSError("GetDIBits failed to copy the captured bitmap")
+
+        # BGRX -> RGB
+        np.copyto(buffer, self.staging[..., 2::-1])
+
+
+class X11CaptureBackend(CaptureBackend):
+    """X11 backend built on mss, which keeps its display connection and shared-memory image open"""
+    name = "x11"
+    # XGetImage reads the composited screen, overlays included
+    captures_layered_windows = True
+
+    def __init__(self, ring_depth=3):
+        super().__init__(ring_depth)
+        if mss is None:
+            raise RuntimeError("mss is required for the x11 capture backend")
+        self.sct = None
+
+    def open(self):
+        """Open the X display connection"""
+        if self.sct is None:
+            self.sct = mss.mss()
+
+    def close(self):
+        """Close the X display connection"""
+        with self.lock:
+            if self.sct is not None:
+                self.sct.close()
+                self.sct = None
+
+    def _grab_into(self, buffer, x, y, width, height):
+        self.open()
+        shot = self.sct.grab({"left": x, "top": y, "width": width, "height": height})
+        raw = np.frombuffer(shot.raw, dtype=np.uint8).reshape(height, width, 4)
+
+        # BGRA -> RGB
+        np.copyto(buffer, raw[..., 2::-1])
+
+
+class SyntheticCaptureBackend(CaptureBackend):
+    """In-memory backend that serves supplied frames, for tests and benchmarks
+
+    ``frames`` is either a sequence of RGB arrays, served round-robin, or a
+    callable ``frames(index, width, height)`` returning one. Frames are cropped
+    or padded with white to the requested region size.
+    """
+    name = "synthetic"
+
+    def __init__(self, frames=None, ring_depth=3):
+        super().__init__(ring_depth)
+        self.frames = frames
+        self.frame_index = 0
+
+    def _grab_into(self, buffer, x, y, width, height):
+        if callable(self.frames):
+            frame = self.frames(self.frame_index, width, height)
+        elif self.frames:
+            frame = self.frames[self.frame_index % len(self.frames)]
+        else:
+            frame = None
+        self.frame_index += 1
+
+        if frame is None:
+            buffer.fill(255)
+            return
+
+        frame_height = min(height, frame.shape[0])
+        frame_width = min(width, frame.shape[1])
+        if frame_height < height or frame_width < width:
+            buffer.fill(255)
+        buffer[:frame_height, :frame_width] = frame[:frame_height, :frame_width, :3]
+
+
+CAPTURE_BACKENDS = {
+    "win32": Win32CaptureBackend,
+    "x11": X11CaptureBackend,
+    "synthetic": SyntheticCaptureBackend,
+}
+
+
+def create_capture_backend(name=None, ring_depth=3):
+    """Create a capture backend by name, or the native one for this platform"""
+    if not name:
+        name = "win32" if sys.platform == "win32" else "x11"
+    try:
+        backend_class = CAPTURE_BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unknown capture backend: {name}")
+
+    logger.info(f"Using {name} capture backend")
+    return backend_class(ring_depth=ring_depth)
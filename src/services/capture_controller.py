@@ -0,0 +1,92 @@
+"""
+Adaptive capture rate control for watch mode
+"""
+import threading
+import numpy as np
+
+
+def frame_signature(frame, size=32):
+    """Small greyscale thumbnail of a frame for cheap change detection"""
+    step_y = max(1, frame.shape[0] // size)
+    step_x = max(1, frame.shape[1] // size)
+    return frame[::step_y, ::step_x].mean(axis=2, dtype=np.float32)
+
+
+def frame_difference(a, b):
+    """Mean absolute difference between two signatures, from 0 (same) to 1"""
+    if a is None or b is None or a.shape != b.shape:
+        return 1.0
+    return float(np.abs(a - b).mean()) / 255.0
+
+
+class AdaptiveCaptureController:
+    """Chooses when watch mode captures and processes the next frame
+
+    The frame rate jumps to ``max_fps`` when frames change and decays towards
+    ``min_fps`` while the region stays static. The interval never drops below
+    what keeps measured processing time within ``cpu_budget`` (the share of
+    one core the pipeline may use), and no frame is captured while
+    ``max_in_flight`` frames are still being processed.
+    """
+    def __init__(self, min_fps=1.0, max_fps=10.0, cpu_budget=0.5, change_threshold=0.01,
+                 decay=0.8, max_in_flight=1):
+        self.min_interval = 1.0 / max_fps
+        self.max_interval = 1.0 / min_fps
+        self.cpu_budget = cpu_budget
+        self.change_threshold = change_threshold
+        self.decay = decay
+        self.max_in_flight = max_in_flight
+
+        self.interval = self.max_interval
+        self.last_signature = None
+        self.work_time = 0.0
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+        self.frames_captured = 0
+        self.frames_changed = 0
+        self.frames_skipped = 0
+
+    def should_capture(self):
+        """Check if the pipeline has room for another frame, counting a skip if not"""
+        with self.lock:
+            if self.in_flight >= self.max_in_flight:
+                self.frames_skipped += 1
+                return False
+            return True
+
+    def observe_frame(self, frame):
+        """Record a captured frame and return True if it differs from the last one"""
+        signature = frame_signature(frame)
+        changed = frame_difference(signature, self.last_signature) > self.change_threshold
+        self.last_signature = signature
+        self.frames_captured += 1
+
+        if changed:
+            self.frames_changed += 1
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval / self.decay)
+        return changed
+
+    def begin_work(self):
+        """Mark a frame as handed to the pipeline"""
+        with self.lock:
+            self.in_flight += 1
+
+    def end_work(self, seconds):
+        """Mark a frame as processed, recording how long it took"""
+        with self.lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            # Exponentially weighted so a single slow frame does not stall capture
+            self.work_time = seconds if not self.work_time else 0.7 * self.work_time + 0.3 * seconds
+
+    def next_interval(self):
+        """Seconds to wait before the next capture"""
+        budget_interval = self.work_time / self.cpu_budget if self.cpu_budget > 0 else 0.0
+        return max(self.interval, budget_interval)
+
+    def reset(self):
+        """Forget the last frame so the next capture counts as changed"""
+        self.last_signature = None
+        self.interval = self.max_interval
@@ -0,0 +1,76 @@
+"""
+Rolling dialogue history used as translation context
+"""
+import threading
+from collections import OrderedDict
+from services.token_budget import TokenCounter
+
+
+class ConversationContext:
+    """Recent source/translation pairs of one capture region, bounded by a token budget
+
+    A repeated line moves to the newest position instead of being stored
+    twice, and the oldest pairs are evicted once the budget is exceeded.
+    """
+    def __init__(self, max_tokens=256, counter=None):
+        self.max_tokens = max_tokens
+        self.counter = counter or TokenCounter()
+        self.pairs = OrderedDict()
+        self.costs = {}
+        self.tokens = 0
+
+    def add(self, source, translation):
+        source = " ".join(source.split())
+        if not source:
+            return
+        if source in self.pairs:
+            self.tokens -= self.costs.pop(source)
+            del self.pairs[source]
+
+        cost = self.counter.count(f"{source} => {translation}") + 1
+        self.pairs[source] = translation
+        self.costs[source] = cost
+        self.tokens += cost
+
+        while self.tokens > self.max_tokens and len(self.pairs) > 1:
+            oldest, _ = self.pairs.popitem(last=False)
+            self.tokens -= self.costs.pop(oldest)
+
+    def render(self):
+        """History as ``source => translation`` lines, oldest first"""
+        return "\n".join(f"{source} => {translation}" for source, translation in self.pairs.items())
+
+    def clear(self):
+        self.pairs.clear()
+        self.costs.clear()
+        self.tokens = 0
+
+
+class ConversationMemory:
+    """Conversation contexts keyed by capture region"""
+    def __init__(self, max_tokens=256):
+        self.max_tokens = max_tokens
+        self.counter = TokenCounter()
+        self.regions = {}
+        self.lock = threading.Lock()
+
+    def render(self, region):
+        with self.lock:
+            context = self.regions.get(region)
+            return context.render() if context else ""
+
+    def add(self, region, pairs):
+        """Record ``(source, translation)`` pairs for a region, in reading order"""
+        with self.lock:
+            context = self.regions.get(region)
+            if context is None:
+                context = self.regions[region] = ConversationContext(self.max_tokens, self.counter)
+            for source, translation in pairs:
+                context.add(source, translation)
+
+    def clear(self, region=None):
+        with self.lock:
+            if region is None:
+                self.regions.clear()
+            elif region in self.regions:
+                self.regions[region].clear()
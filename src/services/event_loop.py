@@ -0,0 +1,59 @@
+"""
+Shared asyncio event loop running on a background thread
+"""
+import asyncio
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopThread:
+    """An asyncio event loop on a daemon thread that any thread can submit coroutines to
+
+    ``submit`` returns a ``concurrent.futures.Future``; cancelling it
+    cancels the coroutine's task on the loop, which for a translation request
+    closes the in-flight HTTP request.
+    """
+    def __init__(self, name="asyncio"):
+        self.name = name
+        self.loop = None
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                self.loop = asyncio.new_event_loop()
+                self.thread = threading.Thread(target=self.run, name=self.name, daemon=True)
+                self.thread.start()
+        return self.loop
+
+    def run(self):
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def submit(self, coroutine):
+        """Schedule a coroutine on the loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.start())
+
+    def stop(self):
+        with self.lock:
+            if self.thread is None:
+                return
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout=5)
+            self.thread = None
+            self.loop = None
+
+
+_shared_loop = EventLoopThread("translation-loop")
+
+
+def get_shared_loop():
+    """Get the process-wide event loop thread, started on first use"""
+    _shared_loop.start()
+    return _shared_loop
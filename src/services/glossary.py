@@ -0,0 +1,155 @@
+"""
+Glossary of fixed term translations, matched with an Aho-Corasick automaton
+"""
+import csv
+import json
+import logging
+import os
+from collections import deque
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class GlossaryEntry:
+    """A source term and the translation it must always get"""
+    source: str
+    target: str
+    note: str = ""
+
+
+class AhoCorasick:
+    """Multi-pattern string matcher that scans text in a single linear pass"""
+    def __init__(self):
+        self.transitions = [{}]
+        self.fail = [0]
+        self.outputs = [[]]
+        self.built = False
+
+    def add(self, pattern, value):
+        """Add a pattern; ``value`` is reported for every match"""
+        state = 0
+        for char in pattern:
+            next_state = self.transitions[state].get(char)
+            if next_state is None:
+                next_state = len(self.transitions)
+                self.transitions[state][char] = next_state
+                self.transitions.append({})
+                self.fail.append(0)
+                self.outputs.append([])
+            state = next_state
+        self.outputs[state].append((len(pattern), value))
+        self.built = False
+
+    def build(self):
+        """Compute failure links breadth-first"""
+        queue = deque(self.transitions[0].values())
+        for state in queue:
+            self.fail[state] = 0
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.transitions[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.transitions[fallback].get(char, 0)
+                self.outputs[next_state].extend(self.outputs[self.fail[next_state]])
+        self.built = True
+
+    def search(self, text):
+        """Yield ``(start, end, value)`` for every pattern occurrence in text"""
+        if not self.built:
+            self.build()
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self.transitions[state]:
+                state = self.fail[state]
+            state = self.transitions[state].get(char, 0)
+            for length, value in self.outputs[state]:
+                yield index - length + 1, index + 1, value
+
+
+def _is_word_char(char):
+    return char.isascii() and char.isalnum()
+
+
+class Glossary:
+    """Term list that reports which entries occur in a piece of text
+
+    Latin terms only match on word boundaries; CJK terms match anywhere.
+    """
+    def __init__(self, entries=(), case_sensitive=False):
+        self.case_sensitive = case_sensitive
+        self.entries = []
+        self.automaton = AhoCorasick()
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry):
+        if not entry.source.strip():
+            return
+        self.entries.append(entry)
+        source = entry.source if self.case_sensitive else entry.source.lower()
+        self.automaton.add(source, entry)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def match(self, text):
+        """Get the entries occurring in text, in order of first occurrence
+
+        Terms covered by a longer matching term are left out.
+        """
+        if not self.entries or not text:
+            return []
+        haystack = text if self.case_sensitive else text.lower()
+
+        spans = []
+        for start, end, entry in self.automaton.search(haystack):
+            if _is_word_char(haystack[start]) and start > 0 and _is_word_char(haystack[start - 1]):
+                continue
+            if _is_word_char(haystack[end - 1]) and end < len(haystack) and _is_word_char(haystack[end]):
+                continue
+            spans.append((start, end, entry))
+
+        # Longest first, so shorter terms inside a longer match are dropped
+        spans.sort(key=lambda span: (span[0] - span[1], span[0]))
+        kept = []
+        for start, end, entry in spans:
+            if not any(s <= start and end <= e for s, e, _ in kept):
+                kept.append((start, end, entry))
+
+        matched = {}
+        for _, _, entry in sorted(kept, key=lambda span: span[0]):
+            matched.setdefault(entry, None)
+        return list(matched)
+
+    @classmethod
+    def load(cls, path, case_sensitive=False):
+        """Load a glossary from JSON (list of objects or a mapping), CSV or TSV"""
+        entries = []
+        extension = os.path.splitext(path)[1].lower()
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                if extension == ".json":
+                    data = json.load(f)
+                    if isinstance(data, dict):
+                        entries = [GlossaryEntry(source, target) for source, target in data.items()]
+                    else:
+                        entries = [
+                            GlossaryEntry(item["source"], item["target"], item.get("note", ""))
+                            for item in data
+                        ]
+                else:
+                    delimiter = "\t" if extension == ".tsv" else ","
+                    for row in csv.reader(f, delimiter=delimiter):
+                        if len(row) >= 2 and not row[0].startswith("#"):
+                            entries.append(GlossaryEntry(row[0], row[1], row[2] if len(row) > 2 else ""))
+        except Exception as e:
+            logger.error(f"Error loading glossary {path}: {str(e)}")
+            raise
+
+        logger.info(f"Loaded {len(entries)} glossary entries from {path}")
+        return cls(entries, case_sensitive)
@@ -0,0 +1,78 @@
+"""
+Idle model unloading and memory-pressure watchdog
+"""
+import logging
+import os
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+def process_rss():
+    """Resident set size of this process in bytes, or None if it cannot be read"""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryWatchdog:
+    """Background thread that frees OCR models when they are idle or memory runs high
+
+    Every ``interval`` seconds the OCR models are unloaded once OCR has been
+    idle for ``idle_timeout`` seconds, or immediately when the process RSS
+    exceeds ``max_rss_mb``, in which case the ``caches`` (objects with a
+    ``clear`` method) are emptied too. While RSS stays above the limit with
+    the models already unloaded, the caches are left alone rather than
+    cleared on every check. Either limit can be disabled with 0.
+    RSS comes from psutil when installed and /proc otherwise.
+    """
+    def __init__(self, ocr_service, idle_timeout=600, max_rss_mb=0, interval=30, caches=()):
+        self.ocr_service = ocr_service
+        self.idle_timeout = idle_timeout
+        self.max_rss_mb = max_rss_mb
+        self.interval = interval
+        self.caches = list(caches)
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None and (self.idle_timeout or self.max_rss_mb):
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, name="memory-watchdog", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread = None
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Error in memory watchdog: {str(e)}")
+
+    def check(self):
+        """Unload models if the idle or memory limit has been reached"""
+        if self.max_rss_mb:
+            rss = process_rss()
+            if rss is not None and rss > self.max_rss_mb * 1024 * 1024:
+                if self.ocr_service.loaded:
+                    logger.warning(f"Process RSS {rss / 1024 / 1024:.0f} MB exceeds {self.max_rss_mb} MB, freeing models and caches")
+                    for cache in self.caches:
+                        cache.clear()
+                    self.ocr_service.unload_models()
+                return
+
+        if self.idle_timeout and self.ocr_service.loaded and self.ocr_service.idle_time() >= self.idle_timeout:
+            logger.info(f"OCR idle for {self.idle_timeout} s, unloading models")
+            self.ocr_service.unload_models()
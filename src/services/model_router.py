@@ -0,0 +1,62 @@
+"""
+Per-request model selection for translation
+"""
+import logging
+import threading
+from utils.script_detection import dominant_script
+
+logger = logging.getLogger(__name__)
+
+# Short UI labels go to the fastest model and long passages to a stronger one
+DEFAULT_ROUTES = [
+    {"max_chars": 80, "models": ["gpt-4o-mini"]},
+    {"min_chars": 600, "models": ["gpt-4o"]},
+]
+
+
+class ModelRouter:
+    """Chooses a model for each request from configurable routing rules
+
+    Rules are checked in order and the first match wins. A rule may set
+    ``min_chars``/``max_chars`` (text length), ``scripts`` (dominant script
+    of the text, e.g. ``"kana"``, ``"hangul"``, ``"han"``, ``"latin"``) and
+    ``min_glossary_hits``. When a rule lists several ``models``, the one with
+    the lowest recent latency is used; models without measurements go first
+    so each gets tried. Text matching no rule uses ``default_model``.
+    """
+    def __init__(self, default_model, routes=None, smoothing=0.3):
+        self.default_model = default_model
+        self.routes = routes if routes is not None else DEFAULT_ROUTES
+        self.smoothing = smoothing
+        self.latencies = {}
+        self.lock = threading.Lock()
+
+    def matches(self, route, text, glossary_hits):
+        length = len(text)
+        if "min_chars" in route and length < route["min_chars"]:
+            return False
+        if "max_chars" in route and length > route["max_chars"]:
+            return False
+        if "scripts" in route and dominant_script(text) not in route["scripts"]:
+            return False
+        if "min_glossary_hits" in route and glossary_hits < route["min_glossary_hits"]:
+            return False
+        return True
+
+    def choose(self, text, glossary_hits=0):
+        """Pick the model for a request"""
+        for route in self.routes:
+            if self.matches(route, text, glossary_hits):
+                models = route.get("models") or [self.default_model]
+                with self.lock:
+                    return min(models, key=lambda model: self.latencies.get(model, 0.0))
+        return self.default_model
+
+    def record_latency(self, model, seconds):
+        """Update a model's smoothed request latency"""
+        with self.lock:
+            previous = self.latencies.get(model)
+            if previous is None:
+                self.latencies[model] = seconds
+            else:
+                self.latencies[model] = (1 - self.smoothing) * previous + self.smoothing * seconds
@@ -0,0 +1,233 @@
+"""
+Structured OCR results with line and paragraph reconstruction
+"""
+import hashlib
+import re
+import statistics
+from dataclasses import dataclass, field
+
+# Hiragana, katakana, CJK ideographs, hangul and full-width forms
+CJK_PATTERN = re.compile(r"[぀-ヿ㐀-䶿一-鿿가-힯豈-﫿＀-￯]")
+
+# Vertical overlap (as a fraction of the smaller height) for two boxes to share a line
+LINE_OVERLAP = 0.5
+# Largest horizontal gap within a line, in line heights
+LINE_GAP = 2.0
+# Largest gap between consecutive lines of a paragraph, in line heights
+PARAGRAPH_GAP = 0.8
+
+
+def text_key(text):
+    """Stable key for a piece of OCR text, independent of its position on screen"""
+    normalized = " ".join(text.split())
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def is_cjk(text):
+    """Check if text contains CJK characters"""
+    return bool(CJK_PATTERN.search(text))
+
+
+def join_text(parts):
+    """Join text fragments, omitting spaces between CJK fragments"""
+    joined = ""
+    for part in parts:
+        if joined and not (is_cjk(joined[-1]) and is_cjk(part[:1])):
+            joined += " "
+        joined += part
+    return joined
+
+
+@dataclass
+class OCRSegment:
+    """A single recognized text box"""
+    box: list
+    text: str
+    confidence: float
+    key: str = ""
+    vertical: bool = False
+    line: int = -1
+    paragraph: int = -1
+
+    def __post_init__(self):
+        self.box = [[float(x), float(y)] for x, y in self.box]
+        self.confidence = float(self.confidence)
+        if not self.key:
+            self.key = text_key(self.text)
+        width, height = self.x1 - self.x0, self.y1 - self.y0
+        self.vertical = is_cjk(self.text) and len(self.text) > 1 and height > 1.5 * width
+
+    @property
+    def x0(self):
+        return min(x for x, _ in self.box)
+
+    @property
+    def y0(self):
+        return min(y for _, y in self.box)
+
+    @property
+    def x1(self):
+        return max(x for x, _ in self.box)
+
+    @property
+    def y1(self):
+        return max(y for _, y in self.box)
+
+
+@dataclass
+class OCRLine:
+    """Segments read together as one line (or one column for vertical text)"""
+    segments: list
+    text: str
+    key: str
+    paragraph: int = -1
+
+
+@dataclass
+class OCRParagraph:
+    """Consecutive lines that form a block of text"""
+    lines: list = field(default_factory=list)
+
+
+@dataclass
+class OCRResult:
+    """OCR output with segments grouped into lines and paragraphs in reading order"""
+    segments: list
+    lines: list
+    paragraphs: list
+    vertical: bool = False
+    language: str = None
+
+    @property
+    def text(self):
+        """Full text with line breaks between lines and blank lines between paragraphs"""
+        return self.render([line.text for line in self.lines])
+
+    def render(self, line_texts):
+        """Lay out per-line texts (e.g. translations) with this result's paragraph structure"""
+        return "\n\n".join(
+            "\n".join(line_texts[index] for index in paragraph.lines)
+            for paragraph in self.paragraphs
+        )
+
+
+class SpatialGrid:
+    """Uniform grid index for finding boxes near a query rectangle"""
+    def __init__(self, cell_size):
+        self.cell_size = max(cell_size, 1.0)
+        self.cells = {}
+
+    def _cells(self, x0, y0, x1, y1):
+        size = self.cell_size
+        for cx in range(int(x0 // size), int(x1 // size) + 1):
+            for cy in range(int(y0 // size), int(y1 // size) + 1):
+                yield cx, cy
+
+    def insert(self, item, rect):
+        for cell in self._cells(*rect):
+            self.cells.setdefault(cell, []).append(item)
+
+    def query(self, rect):
+        found = set()
+        for cell in self._cells(*rect):
+            found.update(self.cells.get(cell, ()))
+        return found
+
+
+def _find(parents, item):
+    while parents[item] != item:
+        parents[item] = parents[parents[item]]
+        item = parents[item]
+    return item
+
+
+def _group(rects, linked, reach):
+    """Union rects that ``linked`` says belong together, using a grid to limit comparisons"""
+    heights = [rect[3] - rect[1] for rect in rects]
+    grid = SpatialGrid(statistics.median(heights))
+    for index, rect in enumerate(rects):
+        grid.insert(index, rect)
+
+    parents = list(range(len(rects)))
+    for index, (x0, y0, x1, y1) in enumerate(rects):
+        margin = reach * heights[index]
+        for other in grid.query((x0 - margin, y0 - margin, x1 + margin, y1 + margin)):
+            if other > index and linked(rects[index], rects[other]):
+                parents[_find(parents, other)] = _find(parents, index)
+
+    groups = {}
+    for index in range(len(rects)):
+        groups.setdefault(_find(parents, index), []).append(index)
+    return list(groups.values())
+
+
+def _same_line(a, b):
+    overlap = min(a[3], b[3]) - max(a[1], b[1])
+    min_height = min(a[3] - a[1], b[3] - b[1])
+    if min_height <= 0 or overlap < LINE_OVERLAP * min_height:
+        return False
+    gap = max(a[0], b[0]) - min(a[2], b[2])
+    return gap <= LINE_GAP * max(a[3] - a[1], b[3] - b[1])
+
+
+def _same_paragraph(a, b):
+    height = max(a[3] - a[1], b[3] - b[1])
+    gap = max(a[1], b[1]) - min(a[3], b[3])
+    horizontal_overlap = min(a[2], b[2]) - max(a[0], b[0])
+    return gap <= PARAGRAPH_GAP * height and horizontal_overlap > 0
+
+
+def _bounds(rects):
+    return (
+        min(rect[0] for rect in rects),
+        min(rect[1] for rect in rects),
+        max(rect[2] for rect in rects),
+        max(rect[3] for rect in rects)
+    )
+
+
+def build_layout(entries):
+    """Build an OCRResult from ``readtext``-style ``(box, text, confidence)`` entries
+
+    Vertical CJK text is handled by rotating the coordinate space so columns
+    read top to bottom and progress right to left, then reusing the
+    horizontal line and paragraph grouping.
+    """
+    segments = [OCRSegment(box, text, confidence) for box, text, confidence in entries if text.strip()]
+    if not segments:
+        return OCRResult([], [], [])
+
+    vertical = sum(segment.vertical for segment in segments) * 2 > len(segments)
+    if vertical:
+        rects = [(s.y0, -s.x1, s.y1, -s.x0) for s in segments]
+    else:
+        rects = [(s.x0, s.y0, s.x1, s.y1) for s in segments]
+
+    # Lines, ordered top to bottom (right to left for vertical text)
+    line_groups = _group(rects, _same_line, LINE_GAP)
+    line_groups = [sorted(group, key=lambda i: rects[i][0]) for group in line_groups]
+    line_rects = [_bounds([rects[i] for i in group]) for group in line_groups]
+    order = sorted(range(len(line_groups)), key=lambda i: (line_rects[i][1], line_rects[i][0]))
+    line_groups = [line_groups[i] for i in order]
+    line_rects = [line_rects[i] for i in order]
+
+    # Paragraphs, ordered by their first line; lines are renumbered to follow them
+    paragraph_groups = sorted(sorted(group) for group in _group(line_rects, _same_paragraph, PARAGRAPH_GAP))
+
+    lines = []
+    paragraphs = []
+    for paragraph_index, group in enumerate(paragraph_groups):
+        paragraph = OCRParagraph()
+        for old_index in group:
+            line_index = len(lines)
+            members = [segments[i] for i in line_groups[old_index]]
+            text = join_text([segment.text for segment in members])
+            for segment in members:
+                segment.line = line_index
+                segment.paragraph = paragraph_index
+            lines.append(OCRLine(members, text, text_key(text), paragraph_index))
+            paragraph.lines.append(line_index)
+        paragraphs.append(paragraph)
+
+    ordered_segments = [segment for line in lines for segment in line.segments]
+    return OCRResult(ordered_segments, lines, paragraphs, vertical)
@@ -0,0 +1,144 @@
+"""
+ONNX Runtime inference engine for EasyOCR detection and recognition
+"""
+import logging
+import os
+import re
+import torch
+import easyocr
+from services.ocr_quantization import DEFAULT_MODEL_CACHE_DIR
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
+
+logger = logging.getLogger(__name__)
+
+ONNX_OPSET = 17
+
+
+class _MeanLastDim(torch.nn.Module):
+    """Export-friendly equivalent of AdaptiveAvgPool2d((None, 1))"""
+    def forward(self, x):
+        return x.mean(dim=3, keepdim=True)
+
+
+class _RecognizerExport(torch.nn.Module):
+    """Wraps the recognizer so its unused ``text`` argument is not part of the graph"""
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+        pool = getattr(model, "AdaptiveAvgPool", None)
+        if isinstance(pool, torch.nn.AdaptiveAvgPool2d) and tuple(pool.output_size) == (None, 1):
+            model.AdaptiveAvgPool = _MeanLastDim()
+
+    def forward(self, image):
+        return self.model(image, None)
+
+
+class OnnxModule:
+    """Stand-in for a torch module that runs its forward pass in ONNX Runtime
+
+    EasyOCR's pre- and post-processing are left untouched, so results match
+    ``readtext`` on the same image.
+    """
+    def __init__(self, session):
+        self.session = session
+        self.input_name = session.get_inputs()[0].name
+
+    def eval(self):
+        return self
+
+    def __call__(self, image, *args):
+        outputs = self.session.run(None, {self.input_name: image.detach().cpu().numpy()})
+        outputs = [torch.from_numpy(output) for output in outputs]
+        return outputs[0] if len(outputs) == 1 else tuple(outputs)
+
+
+class OnnxRuntimeEngine:
+    """Exports reader models to ONNX once and serves them through ONNX Runtime"""
+    def __init__(self, cache_dir=None, intra_op_threads=0, inter_op_threads=0):
+        if ort is None:
+            raise RuntimeError("onnxruntime is required for the ONNX OCR engine")
+        self.cache_dir = os.path.join(cache_dir or DEFAULT_MODEL_CACHE_DIR, "onnx")
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+
+    def model_path(self, name):
+        """Path of an exported graph, keyed by the EasyOCR version it came from"""
+        tag = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{name}-easyocr{easyocr.__version__}")
+        return os.path.join(self.cache_dir, f"{tag}.onnx")
+
+    def create_session(self, path):
+        """Create an inference session with the configured thread counts"""
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = self.inter_op_threads
+        if self.inter_op_threads > 1:
+            options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+        return ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+
+    def export(self, module, name, dummy_input, input_names, output_names, dynamic_axes):
+        """Export a module to ONNX unless a cached graph already exists"""
+        path = self.model_path(name)
+        if os.path.exists(path):
+            return path
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        logger.info(f"Exporting {name} to ONNX")
+        with torch.no_grad():
+            torch.onnx.export(
+                module.cpu().eval(),
+                dummy_input,
+                tmp_path,
+                input_names=input_names,
+                output_names=output_names,
+                dynamic_axes=dynamic_axes,
+                opset_version=ONNX_OPSET
+            )
+        os.replace(tmp_path, path)
+        return path
+
+    def export_detector(self, detector, name):
+        """Export the CRAFT detector with dynamic batch and spatial dimensions"""
+        return self.export(
+            detector,
+            f"detector-{name}",
+            torch.randn(1, 3, 640, 640),
+            ["image"],
+            ["score", "feature"],
+            {
+                "image": {0: "batch", 2: "height", 3: "width"},
+                "score": {0: "batch", 1: "score_height", 2: "score_width"},
+                "feature": {0: "batch", 2: "feature_height", 3: "feature_width"}
+            }
+        )
+
+    def export_recognizer(self, recognizer, name, image_height):
+        """Export the recognizer with dynamic batch and width dimensions"""
+        return self.export(
+            _RecognizerExport(recognizer),
+            f"recognizer-{name}",
+            torch.randn(1, 1, image_height, 256),
+            ["image"],
+            ["preds"],
+            {
+                "image": {0: "batch", 3: "width"},
+                "preds": {0: "batch", 1: "sequence"}
+            }
+        )
+
+    def attach(self, reader, name):
+        """Replace a reader's torch models with ONNX Runtime sessions"""
+        if getattr(reader, "detector", None) is not None:
+            path = self.export_detector(reader.detector, name)
+            reader.detector = OnnxModule(self.create_session(path))
+
+        if getattr(reader, "recognizer", None) is not None:
+            path = self.export_recognizer(reader.recognizer, name, reader.imgH)
+            reader.recognizer = OnnxModule(self.create_session(path))
+
+        return reader
@@ -0,0 +1,207 @@
+"""
+Int8 quantization of EasyOCR models for CPU inference
+"""
+import difflib
+import logging
+import os
+import re
+import statistics
+import sys
+import time
+import cv2
+import numpy as np
+import torch
+import easyocr
+from easyocr import imgproc
+
+logger = logging.getLogger(__name__)
+
+QUANTIZATION_MODES = ("fp32", "int8")
+DEFAULT_MODEL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".hovertranslator", "models")
+
+
+def quantize_recognizer(model):
+    """Apply dynamic int8 quantization to the recognizer's LSTM and linear layers"""
+    return torch.ao.quantization.quantize_dynamic(
+        model.cpu().eval(),
+        {torch.nn.LSTM, torch.nn.Linear},
+        dtype=torch.qint8
+    )
+
+
+def detector_input(image, canvas_size=2560, mag_ratio=1.0):
+    """Preprocess an RGB image the same way EasyOCR does before running CRAFT"""
+    resized, _, _ = imgproc.resize_aspect_ratio(
+        image, canvas_size, interpolation=cv2.INTER_LINEAR, mag_ratio=mag_ratio
+    )
+    x = imgproc.normalizeMeanVariance(resized)
+    return torch.from_numpy(x).permute(2, 0, 1).unsqueeze(0)
+
+
+def synthetic_calibration_images(count=4, width=640, height=360):
+    """Generate simple text-like images for calibration when no real captures are available"""
+    rng = np.random.default_rng(0)
+    images = []
+    for _ in range(count):
+        image = np.full((height, width, 3), 255, dtype=np.uint8)
+        for _ in range(8):
+            x = int(rng.integers(0, width - 120))
+            y = int(rng.integers(0, height - 30))
+            cv2.putText(image, "Sample text 123", (x, y + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 0), 2)
+        images.append(image)
+    return images
+
+
+def quantize_detector(model, calibration_images=None):
+    """Apply FX graph mode static int8 quantization to the CRAFT detector
+
+    The detector is convolutional, so dynamic quantization leaves it untouched;
+    static quantization needs a calibration pass to choose activation ranges.
+    Real captures give far better ranges than the synthetic fallback.
+    """
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import prepare_fx, convert_fx
+
+    images = calibration_images or synthetic_calibration_images()
+    inputs = [detector_input(image) for image in images]
+
+    model = model.cpu().eval()
+    qconfig_mapping = get_default_qconfig_mapping(torch.backends.quantized.engine)
+    prepared = prepare_fx(model, qconfig_mapping, example_inputs=(inputs[0],))
+    with torch.no_grad():
+        for x in inputs:
+            prepared(x)
+    return convert_fx(prepared)
+
+
+class ModelQuantizer:
+    """Quantizes reader models at load time
+
+    The recognizer is quantized dynamically on every load, which is quick.
+    The statically quantized detector needs a calibration pass, so its
+    weights are cached on disk and loaded into a freshly converted detector.
+    """
+    def __init__(self, mode="int8", quantize_detector=False, cache_dir=None, calibration_images=None):
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {mode}")
+        self.mode = mode
+        self.quantize_detector = quantize_detector
+        self.cache_dir = cache_dir or DEFAULT_MODEL_CACHE_DIR
+        self.calibration_images = calibration_images
+
+    def cache_path(self, name):
+        """Path of a cached quantized state dict, keyed by the library versions that produced it"""
+        tag = f"{name}-{self.mode}-torch{torch.__version__}-easyocr{easyocr.__version__}"
+        tag = re.sub(r"[^A-Za-z0-9_.-]", "_", tag)
+        return os.path.join(self.cache_dir, f"{tag}.pt")
+
+    def load_or_quantize_detector(self, detector, name):
+        """Load the cached static int8 detector weights, or calibrate and cache them
+
+        Converting without calibration is cheap and gives the quantized module
+        structure; the cached scales, zero points and weights are then loaded
+        into it.
+        """
+        path = self.cache_path(name)
+        if os.path.exists(path):
+            try:
+                model = quantize_detector(detector, synthetic_calibration_images(count=1, width=64, height=64))
+                model.load_state_dict(torch.load(path, map_location="cpu", weights_only=True))
+                logger.info(f"Loaded quantized {name} from {path}")
+                return model
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable quantized model cache {path}: {str(e)}")
+
+        start = time.perf_counter()
+        model = quantize_detector(detector, self.calibration_images)
+        logger.info(f"Quantized {name} in {time.perf_counter() - start:.2f}s")
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            torch.save(model.state_dict(), path)
+        except Exception as e:
+            logger.warning(f"Could not cache quantized {name}: {str(e)}")
+        return model
+
+    def apply(self, reader, name):
+        """Replace a CPU reader's models with their quantized versions"""
+        if self.mode == "fp32":
+            return reader
+
+        if getattr(reader, "recognizer", None) is not None:
+            reader.recognizer = quantize_recognizer(reader.recognizer)
+
+        if self.quantize_detector and getattr(reader, "detector", None) is not None:
+            try:
+                reader.detector = self.load_or_quantize_detector(reader.detector, f"detector-{name}")
+            except Exception as e:
+                logger.warning(f"Static quantization of the detector failed, keeping FP32: {str(e)}")
+
+        return reader
+
+
+def _text_similarity(a, b):
+    return difflib.SequenceMatcher(None, a, b).ratio()
+
+
+def _time_readtext(reader, images, repeats):
+    texts = []
+    latencies = []
+    for image in images:
+        reader.readtext(image)  # Exclude first-call overhead from the measurement
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = reader.readtext(image)
+            latencies.append(time.perf_counter() - start)
+        texts.append(' '.join(entry[1] for entry in result))
+    return texts, latencies
+
+
+def benchmark_quantization(images, source_lang="Japanese", references=None, repeats=3,
+                           quantize_detector=False, cache_dir=None):
+    """Compare latency and accuracy of the int8 reader against the FP32 reader
+
+    ``images`` are file paths or arrays accepted by ``readtext``. With
+    ``references`` the accuracy of each model is measured against the expected
+    text; otherwise the int8 output is scored for agreement with FP32.
+    """
+    from services.ocr_service import READER_LANGUAGES, reader_key
+
+    key = reader_key(source_lang)
+    langs = READER_LANGUAGES[key]
+
+    fp32_reader = easyocr.Reader(langs, gpu=False, quantize=False)
+    int8_reader = ModelQuantizer("int8", quantize_detector, cache_dir).apply(
+        easyocr.Reader(langs, gpu=False, quantize=False), key
+    )
+
+    fp32_texts, fp32_latencies = _time_readtext(fp32_reader, images, repeats)
+    int8_texts, int8_latencies = _time_readtext(int8_reader, images, repeats)
+
+    report = {
+        "fp32_latency_ms": statistics.mean(fp32_latencies) * 1000,
+        "int8_latency_ms": statistics.mean(int8_latencies) * 1000,
+    }
+    report["speedup"] = report["fp32_latency_ms"] / report["int8_latency_ms"]
+
+    if references:
+        report["fp32_accuracy"] = statistics.mean(
+            _text_similarity(text, ref) for text, ref in zip(fp32_texts, references)
+        )
+        report["int8_accuracy"] = statistics.mean(
+            _text_similarity(text, ref) for text, ref in zip(int8_texts, references)
+        )
+        report["accuracy_delta"] = report["int8_accuracy"] - report["fp32_accuracy"]
+    else:
+        report["agreement"] = statistics.mean(
+            _text_similarity(a, b) for a, b in zip(int8_texts, fp32_texts)
+        )
+
+    for name, value in report.items():
+        logger.info(f"{name}: {value:.3f}")
+    return report
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    benchmark_quantization(sys.argv[1:])
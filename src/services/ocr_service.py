@@ -2,61 +2,478 @@
 OCR service implementation using EasyOCR
 """
 import easyocr
+from easyocr.utils import reformat_input, get_image_list
+from easyocr.recognition import get_text
 import torch
+import cv2
+import numpy as np
+import gc
+import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
+from services.ocr_quantization import ModelQuantizer
+from services.ocr_onnx import OnnxRuntimeEngine
+from services.ocr_layout import build_layout
+from services.capture_controller import frame_signature, frame_difference
+from services.roi_tracker import ROITracker
+from utils.script_detection import script_profile
+from utils.thread_budget import apply_torch_threads
 
 logger = logging.getLogger(__name__)
 
+READER_LANGUAGES = {
+    'en_ja': ['ja', 'en'],
+    'en_ko': ['ko', 'en'],
+    'en_ch_sim': ['ch_sim', 'en'],
+    'en_ch_tra': ['ch_tra', 'en']
+}
+
+OCR_ENGINES = ("torch", "onnx")
+
+SOURCE_LANGUAGE_READERS = {
+    "Japanese": 'en_ja',
+    "Korean": 'en_ko',
+    "Chinese (Simplified)": 'en_ch_sim',
+    "Chinese (Traditional)": 'en_ch_tra'
+}
+
+# Source language that picks the reader from the text itself
+AUTO_SOURCE = "Auto"
+
+# Scripts each reader recognizes besides Latin
+READER_SCRIPTS = {
+    'en_ja': {"kana", "han"},
+    'en_ko': {"hangul"},
+    'en_ch_sim': {"han"},
+    'en_ch_tra': {"han"}
+}
+
+
+def reader_key(source_lang):
+    """Get the reader key for a source language, defaulting to the Japanese reader"""
+    return SOURCE_LANGUAGE_READERS.get(source_lang, 'en_ja')
+
+
+def warmup_image(text, width=480, height=120):
+    """Small synthetic image with a line of text for warming up the models"""
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    cv2.putText(image, text, (20, height // 2 + 10), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 0), 2)
+    return image
+
+
 class OCRService:
-    def __init__(self):
+    def __init__(self, quantization="int8", quantize_detector=False, model_cache_dir=None,
+                 engine="torch", intra_op_threads=0, inter_op_threads=0, recognition_batch_size=16,
+                 coarse_scale=1.0, refine_confidence=0.5, refine_scale=1.0, min_confidence=0.0,
+                 probe_crops=3, script_change_threshold=0.1, roi_tracking=False):
+        """Initialize OCR service
+
+        On CPU, ``quantization="int8"`` loads int8 quantized recognizers (and,
+        with ``quantize_detector``, a statically quantized detector), cached in
+        ``model_cache_dir``. ``"fp32"`` keeps the full-precision models.
+
+        ``engine="onnx"`` exports the models to ONNX once and runs them on the
+        CPU through ONNX Runtime. Quantization settings only apply to the
+        torch engine. The intra/inter-op thread counts apply to either engine
+        (0 lets the runtime decide).
+
+        Text boxes are recognized in width-sorted batches of up to
+        ``recognition_batch_size`` crops.
+
+        With ``coarse_scale`` below 1, frames are first read at that scale and
+        only boxes with confidence under ``refine_confidence`` are recognized
+        again from the full-resolution frame, upscaled by ``refine_scale``.
+        Segments still under ``min_confidence`` are dropped as junk.
+
+        With the ``"Auto"`` source language, the ``probe_crops`` widest text
+        boxes are read by every reader to pick one. The choice is kept per
+        capture region until the frame differs by more than
+        ``script_change_threshold``.
+
+        With ``roi_tracking``, frames of a capture region are only searched
+        for text around the blocks found by the last full detection; see
+        ``ROITracker`` for when a full detection runs again.
+        """
+        if engine not in OCR_ENGINES:
+            raise ValueError(f"Unknown OCR engine: {engine}")
         self.readers = {}
+        self.detector_reader = None
+        self.detection_cache = OrderedDict()
+        self.detection_cache_size = 8
+        self.lock = threading.RLock()
+        self.ready = threading.Event()
+        self.warmup_report = {}
+        self.gpu = False
+        self.recognition_batch_size = recognition_batch_size
+        self.coarse_scale = coarse_scale
+        self.refine_confidence = refine_confidence
+        self.refine_scale = refine_scale
+        self.min_confidence = min_confidence
+        self.probe_crops = probe_crops
+        self.script_change_threshold = script_change_threshold
+        self.script_cache = {}
+        self.roi_tracker = ROITracker() if roi_tracking else None
+        self.last_used = time.monotonic()
+        self.active = 0
+        self.engine = engine
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.quantizer = ModelQuantizer(quantization, quantize_detector, model_cache_dir)
+        self.onnx_engine = None
+        if engine == "onnx":
+            self.onnx_engine = OnnxRuntimeEngine(model_cache_dir, intra_op_threads, inter_op_threads)
         self.setup_ocr()
         
     def setup_ocr(self):
-        """Initialize OCR readers"""
+        """Initialize the shared text detector and the per-language recognizers
+
+        Detection is language-independent, so a single CRAFT detector is
+        loaded and the language readers only carry their recognizers.
+        """
         try:
-            gpu = torch.cuda.is_available()
-            device = torch.cuda.get_device_name(0) if gpu else "CPU"
-            logger.info(f"Using device: {device} for OCR")
-            
-            # Initialize readers for different languages
-            self.readers = {
-                'en_ja': easyocr.Reader(['ja', 'en'], gpu=gpu),
-                'en_ko': easyocr.Reader(['ko', 'en'], gpu=gpu),
-                'en_ch_sim': easyocr.Reader(['ch_sim', 'en'], gpu=gpu),
-                'en_ch_tra': easyocr.Reader(['ch_tra', 'en'], gpu=gpu)
-            }
+            self.gpu = torch.cuda.is_available() and self.engine == "torch"
+            device = torch.cuda.get_device_name(0) if self.gpu else "CPU"
+            logger.info(f"Using device: {device} with {self.engine} engine for OCR")
+            if self.engine == "torch":
+                apply_torch_threads(self.intra_op_threads, self.inter_op_threads)
+            
+            self.load_detector()
+            for key in READER_LANGUAGES:
+                self.load_reader(key)
             
         except Exception as e:
             logger.error(f"Error setting up OCR: {str(e)}")
             raise
             
+    def prepare_reader(self, reader, name):
+        """Apply the configured engine or quantization to a freshly loaded reader"""
+        # EasyOCR's own quantization is disabled so ours can be cached and configured
+        if self.onnx_engine is not None:
+            return self.onnx_engine.attach(reader, name)
+        if not self.gpu:
+            return self.quantizer.apply(reader, name)
+        return reader
+            
+    def load_detector(self):
+        """Load the shared detection-only reader if it is not loaded yet"""
+        with self.lock:
+            if self.detector_reader is None:
+                reader = easyocr.Reader(['en'], gpu=self.gpu, recognizer=False, quantize=False)
+                self.detector_reader = self.prepare_reader(reader, 'craft')
+            return self.detector_reader
+            
+    def load_reader(self, key):
+        """Load the recognition-only reader for a reader key if it is not loaded yet"""
+        with self.lock:
+            reader = self.readers.get(key)
+            if reader is None:
+                reader = easyocr.Reader(READER_LANGUAGES[key], gpu=self.gpu, detector=False, quantize=False)
+                reader = self.prepare_reader(reader, key)
+                self.readers[key] = reader
+            return reader
+            
+    @property
+    def loaded(self):
+        """True while any model is resident in memory"""
+        return self.detector_reader is not None or bool(self.readers)
+            
+    def idle_time(self):
+        """Seconds since OCR last ran, or 0 while it is running"""
+        with self.lock:
+            return 0.0 if self.active else time.monotonic() - self.last_used
+            
+    def unload_models(self):
+        """Release the detector, the readers and their caches
+
+        Models are loaded again on the next capture; quantized and exported
+        models come from the model cache, so the reload skips the conversion.
+        A capture already in progress keeps its models until it finishes.
+        """
+        with self.lock:
+            if not self.loaded:
+                return
+            self.readers.clear()
+            self.detector_reader = None
+            self.detection_cache.clear()
+            self.script_cache.clear()
+        if self.roi_tracker is not None:
+            self.roi_tracker.reset()
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        logger.info("Unloaded OCR models")
+            
     def get_reader(self, source_lang):
         """Get appropriate reader for the source language"""
-        if source_lang == "Japanese":
-            return self.readers['en_ja']
-        elif source_lang == "Korean":
-            return self.readers['en_ko']
-        elif source_lang == "Chinese (Simplified)":
-            return self.readers['en_ch_sim']
-        elif source_lang == "Chinese (Traditional)":
-            return self.readers['en_ch_tra']
+        return self.load_reader(reader_key(source_lang))
+            
+    def identify_reader(self, crops, signature=None, region=None):
+        """Pick the reader for text of unknown script with a one-shot recognition probe
+
+        The widest crops are recognized by every reader. A reading scores its
+        confidence, halved when none of its letters are in the reader's own
+        script, and the best total wins. Returns ``(reader_key, language)``;
+        text with no letters outside Latin is reported as English.
+        """
+        if region is not None and signature is not None:
+            with self.lock:
+                cached = self.script_cache.get(region)
+            if cached and frame_difference(cached[0], signature) <= self.script_change_threshold:
+                return cached[1], cached[2]
+                
+        probe = sorted(crops, key=lambda crop: crop[1].shape[1], reverse=True)[:self.probe_crops]
+        scores = {}
+        non_latin = False
+        for key in READER_LANGUAGES:
+            score = 0.0
+            for _, text, confidence in self.recognize_crops(self.load_reader(key), probe):
+                scripts = set(script_profile(text))
+                non_latin = non_latin or bool(scripts - {"latin"})
+                score += confidence if scripts & READER_SCRIPTS[key] else confidence / 2
+            scores[key] = score
+            
+        if non_latin:
+            key = max(scores, key=scores.get)
+            language = next(lang for lang, reader in SOURCE_LANGUAGE_READERS.items() if reader == key)
         else:
-            return self.readers['en_ja']  # Default to Japanese reader
+            key, language = 'en_ja', "English"
+        logger.debug(f"Identified {language} text with probe scores {scores}")
+        
+        if region is not None and signature is not None:
+            with self.lock:
+                self.script_cache[region] = (signature, key, language)
+        return key, language
             
-    def perform_ocr(self, image, source_lang):
-        """Perform OCR on the image"""
+    def detect(self, img):
+        """Detect text boxes in a BGR image, reusing results for a frame seen recently
+
+        Returns ``(horizontal_list, free_list)`` as expected by ``recognize``.
+        """
+        digest = hashlib.blake2b(img.tobytes(), digest_size=16).digest()
+        frame_key = (img.shape, digest)
+        with self.lock:
+            if frame_key in self.detection_cache:
+                self.detection_cache.move_to_end(frame_key)
+                return self.detection_cache[frame_key]
+                
+        horizontal_list, free_list = self.load_detector().detect(img, reformat=False)
+        boxes = (horizontal_list[0], free_list[0])
+        
+        with self.lock:
+            self.detection_cache[frame_key] = boxes
+            while len(self.detection_cache) > self.detection_cache_size:
+                self.detection_cache.popitem(last=False)
+        return boxes
+            
+    def recognize_crops(self, reader, crops, batch_size=None):
+        """Recognize ``(box, crop)`` pairs in padded batches of similar width
+
+        Sorting by width keeps padding, and so wasted compute, small within a
+        batch. Returns ``(box, text, confidence)`` entries in the order of ``crops``.
+        """
+        batch_size = batch_size or self.recognition_batch_size
+        ignore_char = ''.join(set(reader.character) - set(reader.lang_char))
+        order = sorted(range(len(crops)), key=lambda i: crops[i][1].shape[1])
+        
+        results = [None] * len(crops)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            entries = get_text(
+                reader.character,
+                reader.imgH,
+                max(crops[i][1].shape[1] for i in batch),
+                reader.recognizer,
+                reader.converter,
+                [crops[i] for i in batch],
+                ignore_char=ignore_char,
+                batch_size=len(batch),
+                workers=0,
+                device=reader.device
+            )
+            for index, entry in zip(batch, entries):
+                results[index] = entry
+        return results
+            
+    def refine_low_confidence(self, reader, entries, owners, greys, batch_size=None):
+        """Recognize low-confidence boxes again from the full-resolution frames
+
+        Each box is cropped from its full-resolution greyscale frame and
+        upscaled by ``refine_scale``; the refined reading replaces the
+        original when it is more confident.
+        """
+        refine = [i for i, entry in enumerate(entries) if entry[2] < self.refine_confidence]
+        crops = []
+        targets = []
+        for i in refine:
+            grey = greys[owners[i]]
+            xs = [x for x, _ in entries[i][0]]
+            ys = [y for _, y in entries[i][0]]
+            x0, x1 = max(0, int(min(xs))), min(grey.shape[1], int(np.ceil(max(xs))))
+            y0, y1 = max(0, int(min(ys))), min(grey.shape[0], int(np.ceil(max(ys))))
+            if x1 <= x0 or y1 <= y0:
+                continue
+                
+            crop = grey[y0:y1, x0:x1]
+            if self.refine_scale != 1.0:
+                crop = cv2.resize(crop, None, fx=self.refine_scale, fy=self.refine_scale, interpolation=cv2.INTER_CUBIC)
+            height, width = crop.shape
+            image_list, _ = get_image_list([[0, width, 0, height]], [], crop, model_height=reader.imgH, sort_output=False)
+            if image_list:
+                crops.append(image_list[0])
+                targets.append(i)
+                
+        if not crops:
+            return entries
+            
+        entries = list(entries)
+        for i, (_, text, confidence) in zip(targets, self.recognize_crops(reader, crops, batch_size)):
+            box, _, old_confidence = entries[i]
+            if confidence > old_confidence:
+                entries[i] = (box, text, confidence)
+        return entries
+            
+    def perform_batch_ocr(self, images, source_lang, batch_size=None, region=None, full_detection=False):
+        """Perform OCR on several frames or crops in shared recognition batches
+
+        Text boxes from all images are pooled before recognition. Returns one
+        OCRResult (or None if no text was found) per image, in order. With
+        the ``"Auto"`` source language, ``region`` keys the cached reader
+        choice and each result's ``language`` is the identified language.
+        With ROI tracking, ``region`` also keys the tracked text blocks of a
+        single captured frame; ``full_detection`` searches the whole frame
+        regardless and refreshes the tracked blocks.
+        """
+        with self.lock:
+            self.active += 1
+            self.last_used = time.monotonic()
         try:
             reader = self.get_reader(source_lang)
-            result = reader.readtext(image)
+            scale = self.coarse_scale
+            crops = []
+            owners = []
+            greys = []
+            signature = None
+            tracking = self.roi_tracker is not None and region is not None and len(images) == 1
             
-            if not result:
-                return None
+            # Each part is (image index, image, greyscale, x offset, y offset, region of interest)
+            parts = []
+            for index, image in enumerate(images):
+                img, img_cv_grey = reformat_input(image)
+                if index == 0 and source_lang == AUTO_SOURCE:
+                    signature = frame_signature(img)
+                rois = self.roi_tracker.plan(region, img) if tracking and not full_detection else None
+                if rois is None:
+                    parts.append((index, img, img_cv_grey, 0, 0, None))
+                else:
+                    for roi in rois:
+                        x0, y0, x1, y1 = roi
+                        parts.append((
+                            index,
+                            np.ascontiguousarray(img[y0:y1, x0:x1]),
+                            np.ascontiguousarray(img_cv_grey[y0:y1, x0:x1]),
+                            x0,
+                            y0,
+                            roi
+                        ))
+                
+            for part, (_, img, img_cv_grey, _, _, _) in enumerate(parts):
+                greys.append(img_cv_grey)
+                if scale < 1.0:
+                    img = cv2.resize(img, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                    img_cv_grey = cv2.resize(img_cv_grey, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+                    
+                horizontal_list, free_list = self.detect(img)
+                image_list, _ = get_image_list(
+                    horizontal_list, free_list, img_cv_grey, model_height=reader.imgH, sort_output=False
+                )
+                crops.extend(image_list)
+                owners.extend([part] * len(image_list))
                 
-            # Extract and join text
-            text = ' '.join([entry[1] for entry in result])
-            return text
+            language = None
+            if source_lang == AUTO_SOURCE and crops:
+                key, language = self.identify_reader(crops, signature, region)
+                reader = self.load_reader(key)
+                
+            entries = self.recognize_crops(reader, crops, batch_size) if crops else []
+            if scale < 1.0:
+                entries = [
+                    ([[x / scale, y / scale] for x, y in box], text, confidence)
+                    for box, text, confidence in entries
+                ]
+            if scale < 1.0 or self.refine_scale > 1.0:
+                entries = self.refine_low_confidence(reader, entries, owners, greys, batch_size)
+                
+            per_part = [[] for _ in parts]
+            for owner, (box, text, confidence) in zip(owners, entries):
+                if confidence >= self.min_confidence:
+                    x0, y0 = parts[owner][3], parts[owner][4]
+                    per_part[owner].append(([[x + x0, y + y0] for x, y in box], text, confidence))
+                    
+            per_image = [[] for _ in images]
+            for (index, img, _, _, _, roi), part_entries in zip(parts, per_part):
+                per_image[index].extend(part_entries)
+                if tracking and roi is None:
+                    self.roi_tracker.update(region, img, [entry[0] for entry in part_entries])
+                elif tracking:
+                    self.roi_tracker.check_edges(region, roi, [entry[0] for entry in part_entries])
+                
+            results = []
+            for image_entries in per_image:
+                result = build_layout(image_entries)
+                result.language = language
+                results.append(result if result.segments else None)
+            return results
             
         except Exception as e:
-            logger.error(f"Error performing OCR: {str(e)}")
+            logger.error(f"Error performing batch OCR: {str(e)}")
             raise
+        finally:
+            with self.lock:
+                self.active -= 1
+                self.last_used = time.monotonic()
+            
+    def perform_structured_ocr(self, image, source_lang, region=None, full_detection=False):
+        """Perform OCR on the image, keeping boxes, confidences and layout
+
+        Returns an OCRResult, or None if no text was found.
+        """
+        return self.perform_batch_ocr([image], source_lang, region=region, full_detection=full_detection)[0]
+            
+    def warm_up(self, source_langs, background=True):
+        """Run synthetic images through the readers so the first real capture is fast
+
+        The first inference pays for lazy torch initialization, allocator
+        growth and kernel selection. ``ready`` is set once warm-up finished.
+        """
+        self.ready.clear()
+        if not background:
+            self._warm_up(source_langs)
+            return
+        threading.Thread(target=self._warm_up, args=(source_langs,), name="ocr-warmup", daemon=True).start()
+            
+    def _warm_up(self, source_langs):
+        try:
+            for source_lang in source_langs:
+                # Different text for each run so the detection cache is not hit
+                start = time.perf_counter()
+                self.perform_structured_ocr(warmup_image("Warm up 123"), source_lang)
+                cold = time.perf_counter() - start
+                
+                start = time.perf_counter()
+                self.perform_structured_ocr(warmup_image("Ready 456"), source_lang)
+                warm = time.perf_counter() - start
+                
+                self.warmup_report[source_lang] = (cold, warm)
+                logger.info(f"OCR warm-up for {source_lang}: cold {cold * 1000:.0f} ms, warm {warm * 1000:.0f} ms")
+                
+        except Exception as e:
+            logger.error(f"Error warming up OCR: {str(e)}")
+        finally:
+            self.ready.set()
+            
+    def perform_ocr(self, image, source_lang):
+        """Perform OCR on the image and return its text in reading order"""
+        result = self.perform_structured_ocr(image, source_lang)
+        return result.text if result else None
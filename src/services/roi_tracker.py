@@ -0,0 +1,141 @@
+"""
+Text region of interest tracking within large capture areas
+"""
+import threading
+from dataclasses import dataclass
+import cv2
+import numpy as np
+
+
+def box_bounds(box):
+    """Axis-aligned ``(x0, y0, x1, y1)`` bounds of a four-point box"""
+    xs = [x for x, _ in box]
+    ys = [y for _, y in box]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def merge_rectangles(rectangles):
+    """Merge overlapping ``(x0, y0, x1, y1)`` rectangles until none overlap"""
+    merged = list(rectangles)
+    changed = True
+    while changed:
+        changed = False
+        result = []
+        for rect in merged:
+            for index, other in enumerate(result):
+                if rect[0] <= other[2] and other[0] <= rect[2] and rect[1] <= other[3] and other[1] <= rect[3]:
+                    result[index] = (
+                        min(rect[0], other[0]), min(rect[1], other[1]),
+                        max(rect[2], other[2]), max(rect[3], other[3])
+                    )
+                    changed = True
+                    break
+            else:
+                result.append(rect)
+        merged = result
+    return merged
+
+
+@dataclass
+class RegionState:
+    """Text blocks found by the last full detection of a capture region"""
+    rois: list
+    signature: object
+    shape: tuple
+    frames: int = 0
+
+
+class ROITracker:
+    """Limits text detection to the blocks where text was last found
+
+    A full detection locates the text; its boxes, grown by ``margin``
+    pixels and merged where they overlap, become the regions of interest
+    that later frames are cropped to. A full detection runs again after
+    ``redetect_frames`` frames, when any cell of an area-averaged thumbnail
+    of the area outside the regions changes by more than ``change_threshold``
+    (new text appearing elsewhere), when text
+    reaches the edge of a region, or when the regions would cover more than
+    ``max_coverage`` of the frame anyway.
+    """
+    def __init__(self, margin=24, redetect_frames=30, change_threshold=0.08, max_coverage=0.6, edge=2,
+                 signature_size=64):
+        self.margin = margin
+        self.redetect_frames = redetect_frames
+        self.change_threshold = change_threshold
+        self.max_coverage = max_coverage
+        self.edge = edge
+        self.signature_size = signature_size
+        self.states = {}
+        self.lock = threading.Lock()
+
+    def masked_signature(self, frame, rois):
+        """Area-averaged greyscale thumbnail of a frame with the regions of interest blanked out
+
+        Every thumbnail cell averages all the pixels it covers, so a small
+        new label clearly changes the cells it falls in.
+        """
+        height, width = frame.shape[:2]
+        size = self.signature_size
+        grey = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        signature = cv2.resize(grey, (size, size), interpolation=cv2.INTER_AREA).astype(np.float32)
+        for x0, y0, x1, y1 in rois:
+            signature[y0 * size // height:-(-y1 * size // height), x0 * size // width:-(-x1 * size // width)] = 0
+        return signature
+
+    @staticmethod
+    def signature_change(a, b):
+        """Largest change of any thumbnail cell, from 0 (same) to 1"""
+        return float(np.abs(a - b).max()) / 255.0
+
+    def plan(self, region, frame):
+        """Get the ``(x0, y0, x1, y1)`` regions to detect text in, or None for a full detection"""
+        with self.lock:
+            state = self.states.get(region)
+            if (state is None or not state.rois or state.frames >= self.redetect_frames
+                    or state.shape != frame.shape[:2]):
+                return None
+            state.frames += 1
+            rois = list(state.rois)
+            signature = state.signature
+        if self.signature_change(self.masked_signature(frame, rois), signature) > self.change_threshold:
+            return None
+        return rois
+
+    def update(self, region, frame, boxes):
+        """Record the text boxes found by a full detection of a frame"""
+        height, width = frame.shape[:2]
+        rectangles = []
+        for box in boxes:
+            x0, y0, x1, y1 = box_bounds(box)
+            rectangles.append((
+                max(0, int(x0) - self.margin), max(0, int(y0) - self.margin),
+                min(width, int(x1) + self.margin + 1), min(height, int(y1) + self.margin + 1)
+            ))
+        rois = merge_rectangles(rectangles)
+        if sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rois) > self.max_coverage * width * height:
+            rois = []
+        state = RegionState(rois, self.masked_signature(frame, rois), (height, width))
+        with self.lock:
+            self.states[region] = state
+
+    def check_edges(self, region, roi, boxes):
+        """Schedule a full detection if text found in a region touches its inner edges"""
+        x0, y0, x1, y1 = roi
+        with self.lock:
+            state = self.states.get(region)
+            if state is None:
+                return
+            height, width = state.shape
+            for box in boxes:
+                bx0, by0, bx1, by1 = box_bounds(box)
+                if ((x0 > 0 and bx0 - x0 <= self.edge) or (y0 > 0 and by0 - y0 <= self.edge)
+                        or (x1 < width and x1 - bx1 <= self.edge) or (y1 < height and y1 - by1 <= self.edge)):
+                    state.frames = self.redetect_frames
+                    return
+
+    def reset(self, region=None):
+        with self.lock:
+            if region is None:
+                self.states.clear()
+            else:
+                self.states.pop(region, None)
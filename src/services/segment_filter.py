@@ -0,0 +1,116 @@
+"""
+Local filter for OCR segments that do not need a translation request
+"""
+import re
+import threading
+from collections import OrderedDict
+from utils.script_detection import script_profile
+
+# Scripts written by each language; Japanese shares kanji with Chinese
+LANGUAGE_SCRIPTS = {
+    "English": {"latin"},
+    "Japanese": {"kana", "han"},
+    "Korean": {"hangul"},
+    "Chinese (Simplified)": {"han"},
+    "Chinese (Traditional)": {"han"},
+}
+
+# Stat names and units that may lead or trail a counter; other words, as in "Top 10", need translating
+COUNTER_UNITS = (
+    "HP", "MP", "SP", "TP", "AP", "EXP", "XP", "LV", "LVL", "ATK", "DEF", "MAT", "MDF", "SPD", "AGI",
+    "STR", "INT", "DEX", "LUK", "CRT", "G", "x", "pts", "pt", "min", "sec", "ms", "s", "m", "h", "%",
+)
+UNIT_PATTERN = "|".join(re.escape(unit) for unit in sorted(COUNTER_UNITS, key=len, reverse=True))
+
+# Counters, stats and timestamps such as "HP 120/300", "Lv.5", "x3", "12:34", "+15%" or "5 min"
+COUNTER = re.compile(
+    rf"^(?:(?:{UNIT_PATTERN})[.:]?\s*)?[-+×x]?\d[\d\s.,:/%+\-]*(?:\s*(?:{UNIT_PATTERN}))?$",
+    re.IGNORECASE
+)
+
+
+class SegmentFilter:
+    """Decides which OCR lines can skip the translation model
+
+    Lines without letters, counters and lines written only in the target
+    language's script are passed through unchanged. Lines seen in at least
+    ``static_after`` captures are treated as static UI labels: their first
+    translation is pinned and served from then on, independent of the
+    translation cache's eviction. Both the seen counts and the pinned
+    labels keep at most ``max_tracked`` entries, least recently used first out.
+    """
+    def __init__(self, static_after=5, max_tracked=4096):
+        self.static_after = static_after
+        self.max_tracked = max_tracked
+        self.seen = OrderedDict()
+        self.static_translations = OrderedDict()
+        self.skipped = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(text, source_lang, target_lang):
+        return (" ".join(text.split()), source_lang, target_lang)
+
+    def classify(self, text, source_lang, target_lang):
+        """Get why a line needs no translation, or None if it does
+
+        Returns ``"empty"``, ``"numeric"`` or ``"target_language"``.
+        """
+        text = " ".join(text.split())
+        if not text:
+            return "empty"
+        profile = script_profile(text)
+        if not profile or COUNTER.match(text):
+            return "numeric"
+
+        scripts = set(profile)
+        target_scripts = LANGUAGE_SCRIPTS.get(target_lang, set())
+        source_scripts = LANGUAGE_SCRIPTS.get(source_lang, set())
+        if scripts <= target_scripts and not scripts & source_scripts:
+            return "target_language"
+        return None
+
+    def observe(self, lines, source_lang, target_lang):
+        """Count each distinct line once per capture"""
+        with self.lock:
+            for key in {self.make_key(line, source_lang, target_lang) for line in lines}:
+                self.seen[key] = self.seen.get(key, 0) + 1
+                self.seen.move_to_end(key)
+            while len(self.seen) > self.max_tracked:
+                self.seen.popitem(last=False)
+
+    def is_static(self, text, source_lang, target_lang):
+        with self.lock:
+            return self.seen.get(self.make_key(text, source_lang, target_lang), 0) >= self.static_after
+
+    def get_static(self, text, source_lang, target_lang, fingerprint=""):
+        """Get the pinned translation of a static label, or None
+
+        ``fingerprint`` identifies the context the translation was pinned
+        under, as in the translation cache key.
+        """
+        key = (self.make_key(text, source_lang, target_lang), fingerprint)
+        with self.lock:
+            translation = self.static_translations.get(key)
+            if translation is not None:
+                self.static_translations.move_to_end(key)
+            return translation
+
+    def pin(self, text, source_lang, target_lang, translation, fingerprint=""):
+        """Keep the translation of a line once it has become a static label"""
+        key = self.make_key(text, source_lang, target_lang)
+        with self.lock:
+            if self.seen.get(key, 0) >= self.static_after:
+                self.static_translations.setdefault((key, fingerprint), translation)
+                while len(self.static_translations) > self.max_tracked:
+                    self.static_translations.popitem(last=False)
+
+    def count_skip(self, reason):
+        with self.lock:
+            self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def clear(self):
+        with self.lock:
+            self.seen.clear()
+            self.static_translations.clear()
+            self.skipped.clear()
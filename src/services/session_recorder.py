@@ -0,0 +1,190 @@
+"""
+Recording of captured frames to a chunked, memory-mappable session file
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from datetime import datetime
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HTSESS01"
+CHUNK_MAGIC = b"CHNK"
+# Chunk header: magic, frame data length, index length
+CHUNK_HEADER = struct.Struct("<4sQI")
+
+
+def timestamped_path(path):
+    """Insert the current date and time before the extension of ``path``"""
+    root, extension = os.path.splitext(path)
+    return f"{root}-{datetime.now():%Y%m%d-%H%M%S}{extension}"
+
+
+class SessionRecorder:
+    """Appends captured frames and their timestamps to a session file
+
+    The file is a sequence of chunks, each holding the raw pixel data of up
+    to ``chunk_frames`` frames followed by a JSON index of
+    ``[timestamp, offset, height, width, channels]`` entries. Frames are
+    stored uncompressed so a replay can map them straight from disk, and a
+    frame identical to one already recorded (common while the screen is
+    static) only adds an index entry pointing at the earlier data. Every
+    complete chunk stays readable if the app exits without ``close``.
+
+    ``record`` only copies the frame and queues it; a writer thread hashes
+    and writes it, so recording does not hold up the capturing thread.
+    Frames that would take the queued pixel data past ``max_queued_mb`` are
+    dropped. An existing file is never overwritten.
+    """
+    def __init__(self, path, chunk_frames=32, max_queued_mb=64):
+        self.path = path
+        self.chunk_frames = chunk_frames
+        self.file = open(path, "xb")
+        self.file.write(MAGIC)
+        self.start = time.perf_counter()
+        self.offsets = {}
+        self.pending_index = []
+        self.pending_data = []
+        self.pending_size = 0
+        self.frames = 0
+        self.dropped = 0
+        self.lock = threading.RLock()
+        self.queue = queue.Queue()
+        self.max_queued_bytes = max_queued_mb * 1024 * 1024
+        self.queued_bytes = 0
+        self.writer = threading.Thread(target=self.run, name="session-recorder", daemon=True)
+        self.writer.start()
+
+    def record(self, frame, timestamp=None):
+        """Queue a copy of a frame, timestamped relative to the start of the recording"""
+        if timestamp is None:
+            timestamp = time.perf_counter() - self.start
+        if self.file is None:
+            return
+        with self.lock:
+            if self.queued_bytes + frame.nbytes > self.max_queued_bytes:
+                self.dropped += 1
+                return
+            self.queued_bytes += frame.nbytes
+        # Capture backends reuse their frame buffers, so the writer needs its own copy
+        self.queue.put((np.array(frame, dtype=np.uint8), timestamp))
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            try:
+                self.write_frame(*item)
+            except Exception as e:
+                logger.error(f"Error recording frame: {str(e)}")
+            finally:
+                with self.lock:
+                    self.queued_bytes -= item[0].nbytes
+                self.queue.task_done()
+
+    def write_frame(self, frame, timestamp):
+        """Add a frame to the open chunk, writing the chunk once it is full"""
+        frame = np.ascontiguousarray(frame)
+        if frame.ndim == 2:
+            frame = frame[:, :, None]
+        data = frame.tobytes()
+        digest = hashlib.blake2b(data, digest_size=16).digest() + struct.pack("<3I", *frame.shape)
+
+        with self.lock:
+            if self.file is None:
+                return
+            offset = self.offsets.get(digest)
+            if offset is None:
+                # Data of the open chunk starts after the file's current end and the chunk header
+                offset = self.file.tell() + CHUNK_HEADER.size + self.pending_size
+                self.offsets[digest] = offset
+                self.pending_data.append(data)
+                self.pending_size += len(data)
+            self.pending_index.append([timestamp, offset, *frame.shape])
+            self.frames += 1
+            if len(self.pending_index) >= self.chunk_frames:
+                self.flush_chunk()
+
+    def flush(self):
+        """Write all queued frames and the open chunk to disk"""
+        self.queue.join()
+        self.flush_chunk()
+
+    def flush_chunk(self):
+        """Write the open chunk to disk"""
+        with self.lock:
+            if self.file is None or not self.pending_index:
+                return
+            index = json.dumps(self.pending_index, separators=(",", ":")).encode("utf-8")
+            self.file.write(CHUNK_HEADER.pack(CHUNK_MAGIC, self.pending_size, len(index)))
+            for data in self.pending_data:
+                self.file.write(data)
+            self.file.write(index)
+            self.file.flush()
+            self.pending_index = []
+            self.pending_data = []
+            self.pending_size = 0
+
+    def close(self):
+        if self.writer.is_alive():
+            self.queue.put(None)
+            self.writer.join()
+        self.flush_chunk()
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+                dropped = f", dropped {self.dropped}" if self.dropped else ""
+                logger.info(f"Recorded {self.frames} frames to {self.path}{dropped}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SessionReader:
+    """Read-only view of a session file, with frames memory-mapped from disk"""
+    def __init__(self, path):
+        self.path = path
+        self.entries = []
+        size = os.path.getsize(path)
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Not a session recording: {path}")
+            position = len(MAGIC)
+            while position + CHUNK_HEADER.size <= size:
+                magic, data_size, index_size = CHUNK_HEADER.unpack(f.read(CHUNK_HEADER.size))
+                end = position + CHUNK_HEADER.size + data_size + index_size
+                if magic != CHUNK_MAGIC or end > size:
+                    logger.warning(f"Ignoring incomplete chunk at byte {position} of {path}")
+                    break
+                f.seek(data_size, os.SEEK_CUR)
+                self.entries.extend(json.loads(f.read(index_size)))
+                position = end
+        self.data = np.memmap(path, dtype=np.uint8, mode="r") if self.entries else None
+
+    def __len__(self):
+        return len(self.entries)
+
+    def timestamp(self, index):
+        return self.entries[index][0]
+
+    def frame(self, index):
+        """Get a frame as a read-only array backed by the file"""
+        _, offset, height, width, channels = self.entries[index]
+        frame = self.data[offset:offset + height * width * channels].reshape(height, width, channels)
+        return frame[:, :, 0] if channels == 1 else frame
+
+    def __iter__(self):
+        for index in range(len(self.entries)):
+            yield self.timestamp(index), self.frame(index)
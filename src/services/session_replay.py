@@ -0,0 +1,135 @@
+"""
+Deterministic replay of a recorded session through the OCR and translation pipeline
+"""
+import argparse
+import logging
+import time
+from types import SimpleNamespace
+from services.session_recorder import SessionReader
+from services.translation_service import NUMBERED_LINE
+
+logger = logging.getLogger(__name__)
+
+
+class MockChatClient:
+    """Local stand-in for the OpenAI client that answers after a simulated delay
+
+    Replies keep the ``[n]`` numbering of batched requests so they parse like
+    real ones. No usage is reported, so token counts fall back to estimates.
+    """
+    def __init__(self, latency=0.3, seconds_per_char=0.0):
+        self.latency = latency
+        self.seconds_per_char = seconds_per_char
+        self.requests = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages):
+        text = messages[-1]["content"]
+        time.sleep(self.latency + self.seconds_per_char * len(text))
+        self.requests += 1
+        if NUMBERED_LINE.search(text):
+            reply = "\n".join(f"[{number}] <{model}> {line}" for number, line in NUMBERED_LINE.findall(text))
+        else:
+            reply = f"<{model}> {text}"
+        message = SimpleNamespace(content=reply)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered))) - 1))]
+
+
+def summarize(values):
+    return {
+        "p50_ms": percentile(values, 50) * 1000,
+        "p90_ms": percentile(values, 90) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": max(values, default=0.0) * 1000,
+    }
+
+
+def replay_session(path, ocr_service, translation_service, source_lang, target_lang, speed=None,
+                   region="replay"):
+    """Feed a recorded session through OCR, filtering, caching and translation
+
+    With ``speed`` set, frames arrive at their recorded times divided by
+    ``speed``, and end-to-end latency includes any time a frame waited
+    behind the previous one; without it frames are processed back to back.
+    Returns a report of latency percentiles per stage, throughput, cache hit
+    rates and token usage.
+    """
+    session = SessionReader(path)
+    cache = translation_service.cache
+    hits, misses = cache.hits, cache.misses
+
+    totals, ocr_times, translate_times = [], [], []
+    start = time.perf_counter()
+    for timestamp, frame in session:
+        arrival = start + timestamp / speed if speed else time.perf_counter()
+        delay = arrival - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        ocr_start = time.perf_counter()
+        result = ocr_service.perform_structured_ocr(frame, source_lang, region)
+        translate_start = time.perf_counter()
+        if result:
+            translation_service.translate_lines(
+                [line.text for line in result.lines], result.language or source_lang, target_lang
+            )
+        end = time.perf_counter()
+
+        ocr_times.append(translate_start - ocr_start)
+        translate_times.append(end - translate_start)
+        totals.append(end - arrival)
+    elapsed = time.perf_counter() - start
+
+    lookups = (cache.hits - hits) + (cache.misses - misses)
+    usage = translation_service.total_usage
+    segment_filter = translation_service.segment_filter
+    report = {
+        "frames": len(session),
+        "throughput_fps": len(session) / elapsed if elapsed else 0.0,
+        "end_to_end": summarize(totals),
+        "ocr": summarize(ocr_times),
+        "translation": summarize(translate_times),
+        "translation_cache_hit_rate": (cache.hits - hits) / lookups if lookups else 0.0,
+        "requests": usage.requests,
+        "prompt_tokens": usage.prompt,
+        "output_tokens": usage.output,
+        "skipped_segments": dict(segment_filter.skipped) if segment_filter else {},
+    }
+    for name, value in report.items():
+        logger.info(f"{name}: {value}")
+    return report
+
+
+if __name__ == "__main__":
+    from services.ocr_service import OCRService
+    from services.segment_filter import SegmentFilter
+    from services.translation_service import TranslationService, DEFAULT_MODEL
+
+    parser = argparse.ArgumentParser(description="Replay a recorded capture session as a benchmark")
+    parser.add_argument("session")
+    parser.add_argument("--source", default="Japanese")
+    parser.add_argument("--target", default="English")
+    parser.add_argument("--speed", type=float, default=None,
+                        help="replay at recorded timing scaled by this factor (default: as fast as possible)")
+    parser.add_argument("--latency", type=float, default=0.3, help="simulated seconds per translation request")
+    parser.add_argument("--engine", default="torch")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    replay_session(
+        args.session,
+        OCRService(engine=args.engine),
+        TranslationService("replay", model=DEFAULT_MODEL, client=MockChatClient(args.latency),
+                           segment_filter=SegmentFilter()),
+        args.source,
+        args.target,
+        args.speed
+    )
@@ -0,0 +1,78 @@
+"""
+Text stability detection for watch mode
+"""
+import re
+from dataclasses import dataclass
+
+# Text ending like this is likely a complete sentence worth translating early
+SENTENCE_END = re.compile(r"[。．！？!?.…」』）)\]]$")
+
+
+@dataclass
+class StabilityUpdate:
+    """What the watch pipeline should do after a frame's OCR text was observed"""
+    text: str
+    stable: bool = False
+    speculate: bool = False
+    cancel: bool = False
+    use_speculation: bool = False
+
+
+class TextStabilityTracker:
+    """Follows the OCR text of one region across frames
+
+    Typewriter-style dialogue reveals a line a few characters at a time. The
+    text is reported ``stable`` once it has been identical for
+    ``stable_frames`` consecutive frames, and only once per distinct text.
+    With ``speculate`` enabled, a prefix that ends like a full sentence is
+    flagged for early translation; the speculation is cancelled if the text
+    keeps changing and reused if it stabilizes unchanged.
+    """
+    def __init__(self, stable_frames=3, speculate=True, min_speculative_length=4):
+        self.stable_frames = stable_frames
+        self.speculate = speculate
+        self.min_speculative_length = min_speculative_length
+        self.text = ""
+        self.count = 0
+        self.emitted = False
+        self.speculative_text = None
+
+    @property
+    def pending(self):
+        """True while there is text that has not been reported stable yet"""
+        return bool(self.text) and not self.emitted
+
+    def update(self, text):
+        """Observe the OCR text of a new frame"""
+        text = " ".join(text.split())
+        if text == self.text:
+            self.count += 1
+        else:
+            self.text = text
+            self.count = 1
+            self.emitted = False
+
+        update = StabilityUpdate(text)
+        if self.speculative_text is not None and text != self.speculative_text:
+            update.cancel = True
+            self.speculative_text = None
+
+        if (self.speculate and not self.emitted and self.speculative_text is None
+                and self.count == 1 and len(text) >= self.min_speculative_length
+                and SENTENCE_END.search(text)):
+            update.speculate = True
+            self.speculative_text = text
+
+        if text and not self.emitted and self.count >= self.stable_frames:
+            update.stable = True
+            update.use_speculation = self.speculative_text == text
+            self.emitted = True
+            self.speculative_text = None
+
+        return update
+
+    def reset(self):
+        self.text = ""
+        self.count = 0
+        self.emitted = False
+        self.speculative_text = None
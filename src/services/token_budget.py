@@ -0,0 +1,77 @@
+"""
+Local token counting and per-request token accounting
+"""
+import re
+from dataclasses import dataclass, fields
+
+# CJK characters usually cost about a token each, Latin words one plus one
+# per eight characters, and every other non-space symbol one
+TOKEN_PATTERN = re.compile(r"[぀-ヿ㐀-鿿가-힯豈-﫿]|[A-Za-z0-9]+|[^\sA-Za-z0-9]")
+
+# Fixed chat format overhead per message and for priming the reply
+MESSAGE_OVERHEAD = 3
+REPLY_OVERHEAD = 3
+
+
+class TokenCounter:
+    """Estimates token counts locally, without a tokenizer download or network call
+
+    The estimate tracks the OpenAI o200k/cl100k tokenizers closely enough for
+    budgeting; exact counts come back in the API response usage.
+    """
+    def count(self, text):
+        if not text:
+            return 0
+        tokens = 0
+        for piece in TOKEN_PATTERN.findall(text):
+            tokens += 1 + len(piece) // 8 if piece[0].isascii() and piece[0].isalnum() else 1
+        return tokens
+
+    def count_messages(self, messages):
+        return sum(self.count(message["content"]) + MESSAGE_OVERHEAD for message in messages) + REPLY_OVERHEAD
+
+
+@dataclass
+class TokenUsage:
+    """Token breakdown of one request, or a running total of several"""
+    instructions: int = 0
+    glossary: int = 0
+    context: int = 0
+    history: int = 0
+    text: int = 0
+    output: int = 0
+    prompt: int = 0
+    cached: int = 0
+    requests: int = 0
+
+    @property
+    def total(self):
+        return self.prompt + self.output
+
+    def add(self, other):
+        for item in fields(self):
+            setattr(self, item.name, getattr(self, item.name) + getattr(other, item.name))
+
+
+def trim_context(context, max_tokens, counter):
+    """Keep the most recent lines of context that fit in ``max_tokens``
+
+    Context is trimmed from the start, since the latest lines are usually the
+    most relevant; a single oversized line keeps its tail.
+    """
+    if not context or counter.count(context) <= max_tokens:
+        return context
+
+    kept = []
+    used = 0
+    for line in reversed(context.splitlines()):
+        cost = counter.count(line) + 1
+        if used + cost > max_tokens:
+            if not kept:
+                while line and counter.count(line) > max_tokens:
+                    line = line[len(line) // 4 + 1:]
+                kept.append(line)
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(reversed(kept))
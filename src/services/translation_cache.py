@@ -0,0 +1,67 @@
+"""
+In-memory translation cache
+"""
+import threading
+from collections import OrderedDict
+
+
+class TranslationCache:
+    """Thread-safe LRU cache of translations keyed by text, languages, model and fingerprint
+
+    The fingerprint identifies the context and glossary entries a line was
+    translated with (see ``TranslationService.fingerprint``), so editing
+    either gives new translations. Dialogue history is left out of the key;
+    it changes with every line and would make every lookup miss.
+    """
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Translations stored since the last export that did not come from a pack
+        self.unsaved = 0
+
+    @staticmethod
+    def make_key(text, source_lang, target_lang, model, fingerprint=""):
+        return (" ".join(text.split()), source_lang, target_lang, model, fingerprint)
+
+    def get(self, text, source_lang, target_lang, model, fingerprint=""):
+        """Get a cached translation or None"""
+        key = self.make_key(text, source_lang, target_lang, model, fingerprint)
+        with self.lock:
+            translation = self.entries.get(key)
+            if translation is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return translation
+
+    def put(self, text, source_lang, target_lang, model, translation, fingerprint="", from_pack=False):
+        """Store a translation, evicting the least recently used entry when full
+
+        ``from_pack`` marks a translation copied from a translation pack,
+        which does not need exporting again.
+        """
+        key = self.make_key(text, source_lang, target_lang, model, fingerprint)
+        with self.lock:
+            if not from_pack:
+                self.unsaved += 1
+            self.entries[key] = translation
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def items(self):
+        """Snapshot of ``((text, source_lang, target_lang, model, fingerprint), translation)`` pairs"""
+        with self.lock:
+            return list(self.entries.items())
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.unsaved = 0
+
+    def __len__(self):
+        return len(self.entries)
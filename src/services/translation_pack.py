@@ -0,0 +1,168 @@
+"""
+Precompiled, memory-mapped translation packs
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+from services.translation_cache import TranslationCache
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"HTPACK01"
+# Header: magic, slot count, entry count
+HEADER = struct.Struct("<8sQQ")
+# Slot: key hash, record offset (0 marks an empty slot)
+SLOT = struct.Struct("<QQ")
+# Record: key length, translation length, followed by both in UTF-8
+RECORD = struct.Struct("<II")
+KEY_SEPARATOR = "\x1f"
+
+
+def encode_key(text, source_lang, target_lang, model, fingerprint=""):
+    """Pack key bytes, normalized like the translation cache key
+
+    Keys without a fingerprint keep the four-part form of older packs.
+    """
+    key = TranslationCache.make_key(text, source_lang, target_lang, model, fingerprint)
+    return KEY_SEPARATOR.join(key if fingerprint else key[:4]).encode("utf-8")
+
+
+def key_hash(key):
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def write_pack(path, items):
+    """Write ``((text, source_lang, target_lang, model[, fingerprint]), translation)`` items to a pack
+
+    Records are stored sorted by key behind an open-addressing hash table
+    kept at most half full, so lookups touch one or two slots. The file is
+    written next to ``path`` and moved into place, so readers never see a
+    partial pack. Returns the number of entries written.
+    """
+    entries = sorted({encode_key(*key): translation for key, translation in items}.items())
+    slot_count = 8
+    while slot_count < 2 * len(entries):
+        slot_count *= 2
+    mask = slot_count - 1
+    table = bytearray(SLOT.size * slot_count)
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, slot_count, len(entries)))
+        f.write(table)
+        offset = HEADER.size + len(table)
+        for key, translation in entries:
+            value = translation.encode("utf-8")
+            hashed = key_hash(key)
+            slot = hashed & mask
+            while SLOT.unpack_from(table, slot * SLOT.size)[1]:
+                slot = (slot + 1) & mask
+            SLOT.pack_into(table, slot * SLOT.size, hashed, offset)
+            f.write(RECORD.pack(len(key), len(value)))
+            f.write(key)
+            f.write(value)
+            offset += RECORD.size + len(key) + len(value)
+        f.seek(HEADER.size)
+        f.write(table)
+    os.replace(temp_path, path)
+    logger.info(f"Wrote {len(entries)} translations to {path}")
+    return len(entries)
+
+
+class TranslationPack:
+    """Read-only translation pack, memory-mapped so opening it costs almost nothing"""
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.slot_count, self.count = HEADER.unpack_from(self.data)
+        if magic != MAGIC:
+            self.data.close()
+            raise ValueError(f"Not a translation pack: {path}")
+        self.mask = self.slot_count - 1
+        self.records_start = HEADER.size + SLOT.size * self.slot_count
+
+    def __len__(self):
+        return self.count
+
+    def get(self, text, source_lang, target_lang, model, fingerprint=""):
+        """Get the packed translation or None"""
+        key = encode_key(text, source_lang, target_lang, model, fingerprint)
+        hashed = key_hash(key)
+        slot = hashed & self.mask
+        while True:
+            slot_hash, offset = SLOT.unpack_from(self.data, HEADER.size + slot * SLOT.size)
+            if not offset:
+                return None
+            if slot_hash == hashed:
+                key_size, value_size = RECORD.unpack_from(self.data, offset)
+                start = offset + RECORD.size
+                if self.data[start:start + key_size] == key:
+                    return self.data[start + key_size:start + key_size + value_size].decode("utf-8")
+            slot = (slot + 1) & self.mask
+
+    def items(self):
+        """Yield ``((text, source_lang, target_lang, model[, fingerprint]), translation)`` in key order"""
+        offset = self.records_start
+        for _ in range(self.count):
+            key_size, value_size = RECORD.unpack_from(self.data, offset)
+            start = offset + RECORD.size
+            key = self.data[start:start + key_size].decode("utf-8")
+            value = self.data[start + key_size:start + key_size + value_size].decode("utf-8")
+            yield tuple(key.split(KEY_SEPARATOR)), value
+            offset = start + key_size + value_size
+
+    def close(self):
+        self.data.close()
+
+
+def merge_packs(path, sources):
+    """Merge packs into one; for a key in several packs, the earliest source wins
+
+    ``path`` may be one of the sources, since the merged pack replaces it
+    only once it is complete.
+    """
+    merged = {}
+    for source in sources:
+        pack = TranslationPack(source)
+        try:
+            for key, translation in pack.items():
+                merged.setdefault(key, translation)
+        finally:
+            pack.close()
+    return write_pack(path, merged.items())
+
+
+def export_cache(cache, path):
+    """Add a translation cache's entries to the pack at ``path``, creating it if needed
+
+    Cached translations replace packed ones for the same key. When the cache
+    holds no translations beyond those copied from packs, the pack is left
+    as it is, since rewriting a large pack is slow. Returns the number of
+    entries written.
+    """
+    if not cache.unsaved:
+        logger.info(f"No new translations to export to {path}")
+        return 0
+    items = {}
+    if os.path.exists(path):
+        pack = TranslationPack(path)
+        try:
+            items.update(pack.items())
+        finally:
+            pack.close()
+    items.update(cache.items())
+    count = write_pack(path, items.items())
+    cache.unsaved = 0
+    return count
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) < 4 or sys.argv[1] != "merge":
+        print("Usage: python -m services.translation_pack merge OUTPUT PACK [PACK ...]")
+        sys.exit(1)
+    merge_packs(sys.argv[2], sys.argv[3:])
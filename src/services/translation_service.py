@@ -1,19 +1,83 @@
 """
 Translation service implementation using OpenAI API
 """
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+from concurrent.futures import ThreadPoolExecutor
+from services.event_loop import get_shared_loop
+from services.translation_cache import TranslationCache
+from services.token_budget import TokenCounter, TokenUsage, trim_context
+from utils.profiler import NULL_RUN
+import asyncio
+import hashlib
 import logging
 import os
+import re
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL = "gpt-4o-mini"
+NUMBERED_LINE = re.compile(r"^\[(\d+)\]\s?(.*)$", re.MULTILINE)
+CONTEXT_PLACEHOLDER = "Add context to help with translation accuracy..."
+
+# Identical for every request so it forms a cacheable prompt prefix
+TRANSLATION_INSTRUCTIONS = (
+    "You are a professional translator. Translate the user's text into the target language.\n"
+    "Reply with the translation only, no explanations. Keep the original tone, use natural "
+    "expressions in the target language and preserve line breaks. Follow the glossary and use "
+    "the context when given.\n"
+    "If the text is lines numbered like [1], translate each line on its own, using the other "
+    "lines as context, and reply with one line per input line keeping the same [n] numbers.\n"
+)
+
 class TranslationService:
-    def __init__(self, api_key=None):
-        """Initialize translation service with API key"""
+    def __init__(self, api_key=None, model=DEFAULT_MODEL, cache=None, glossary=None, max_context_tokens=512,
+                 conversation=None, router=None, segment_filter=None, client=None, fanout_workers=4,
+                 packs=None, async_client=None, max_concurrent_requests=16):
+        """Initialize translation service with API key
+
+        Context longer than ``max_context_tokens`` is trimmed to its most
+        recent lines before it is added to the prompt. With a
+        ``ConversationMemory``, recent lines of the same capture region are
+        included as dialogue history. With a ``ModelRouter``, the model is
+        chosen per request instead of always using ``model``. With a
+        ``SegmentFilter``, lines that need no translation are answered locally.
+        ``client`` replaces the OpenAI client, e.g. with a local mock for replays.
+        Up to ``fanout_workers`` target languages are translated concurrently.
+        Translation ``packs`` are consulted on a cache miss, before any request.
+
+        The ``*_async`` methods use ``async_client`` (an ``AsyncOpenAI``
+        client by default) with at most ``max_concurrent_requests`` requests
+        in flight.
+        """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             logger.error("No API key provided and OPENAI_API_KEY environment variable not set")
             raise ValueError("OpenAI API key is required. Please provide an API key or set OPENAI_API_KEY environment variable.")
+
+        self.model = model
+        self.cache = cache if cache is not None else TranslationCache()
+        self.glossary = glossary
+        self.max_context_tokens = max_context_tokens
+        self.conversation = conversation
+        self.router = router
+        self.segment_filter = segment_filter
+        self.executor = None
+        self.fanout_workers = fanout_workers
+        self.packs = list(packs or [])
+        self.pack_hits = 0
+        self.async_client = async_client
+        self.max_concurrent_requests = max_concurrent_requests
+        self.request_semaphore = None
+        self.token_counter = TokenCounter()
+        self.total_usage = TokenUsage()
+        self.last_usage = None
+        self.usage_lock = threading.Lock()
+        
+        if client is not None:
+            self.client = client
+            return
         
         try:
             self.client = OpenAI(api_key=self.api_key)
@@ -21,46 +85,461 @@ class TranslationService:
             logger.error(f"Failed to initialize OpenAI client: {str(e)}")
             raise
 
-    def get_translation_prompt(self, source_lang, target_lang, context=None):
-        """Generate translation prompt with optional context"""
-        prompt = (
-            f"You are a professional translator. Translate the following text from {source_lang} to {target_lang}.\n\n"
-        )
+    def get_prompt_parts(self, source_lang, target_lang, context=None, glossary_entries=None, history=None):
+        """Get the system prompt sections, ordered from most to least stable
+
+        Returns ``(instructions, glossary, context, history)``; the fixed
+        instructions and language pair come first so consecutive requests
+        share a prefix that providers can cache.
+        """
+        instructions = f"{TRANSLATION_INSTRUCTIONS}Source language: {source_lang}\nTarget language: {target_lang}\n"
+        
+        glossary = ""
+        if glossary_entries:
+            glossary = "\nGlossary:\n"
+            for entry in glossary_entries:
+                note = f" ({entry.note})" if entry.note else ""
+                glossary += f"{entry.source} => {entry.target}{note}\n"
+        
+        context_part = ""
+        if context and context.strip() and context != CONTEXT_PLACEHOLDER:
+            context = trim_context(context.strip(), self.max_context_tokens, self.token_counter)
+            context_part = f"\nContext:\n{context}\n"
         
-        if context and context.strip() and context != "Add context to help with translation accuracy...":
-            prompt += (
-                f"Context for translation:\n"
-                f"{context}\n\n"
-            )
+        history_part = f"\nPrevious lines and their translations:\n{history}\n" if history else ""
         
-        prompt += (
-            f"Guidelines:\n"
-            f"1. Provide ONLY the translated text\n"
-            f"2. Maintain the original tone and context\n"
-            f"3. Use natural {target_lang} expressions\n"
-            f"4. Preserve formatting and line breaks\n"
-            f"5. NO explanations or additional text\n"
-            f"6. Consider the provided context (if any) for more accurate translation"
+        return instructions, glossary, context_part, history_part
+        
+    def get_translation_prompt(self, source_lang, target_lang, context=None, glossary_entries=None):
+        """Generate translation prompt with optional context and glossary terms"""
+        return "".join(self.get_prompt_parts(source_lang, target_lang, context, glossary_entries))
+
+    def prepare_request(self, text, source_lang, target_lang, context=None, history=None):
+        """Build the system prompt for text along with its estimated token breakdown"""
+        instructions, glossary, context_part, history_part = self.get_prompt_parts(
+            source_lang, target_lang, context, self.match_glossary(text), history
+        )
+        usage = TokenUsage(
+            instructions=self.token_counter.count(instructions),
+            glossary=self.token_counter.count(glossary),
+            context=self.token_counter.count(context_part),
+            history=self.token_counter.count(history_part),
+            text=self.token_counter.count(text)
         )
-        return prompt
+        return instructions + glossary + context_part + history_part, usage
+
+    def record_usage(self, usage):
+        """Add a request's token usage to the running totals"""
+        with self.usage_lock:
+            self.last_usage = usage
+            self.total_usage.add(usage)
+        logger.debug(f"Token usage: {usage}")
+
+    def match_glossary(self, text):
+        """Get the glossary entries that occur in text"""
+        return self.glossary.match(text) if self.glossary else []
+
+    def fingerprint(self, text, context=None):
+        """Short hash of the context and glossary entries a translation of text depends on
+
+        Part of the cache key, so editing the context or the glossary gives
+        new translations instead of cached ones. Empty when there is neither,
+        which keeps those keys compatible with translation packs.
+        """
+        context = context.strip() if context and context != CONTEXT_PLACEHOLDER else ""
+        entries = self.match_glossary(text)
+        if not context and not entries:
+            return ""
+        glossary = "\n".join(f"{entry.source}\x1f{entry.target}\x1f{entry.note or ''}" for entry in entries)
+        return hashlib.blake2b(f"{context}\x1e{glossary}".encode("utf-8"), digest_size=8).hexdigest()
+
+    def select_model(self, text):
+        """Get the model for a request, routed by text when a router is configured"""
+        if self.router is None:
+            return self.model
+        return self.router.choose(text, len(self.match_glossary(text)))
+
+    def complete(self, system_prompt, text, usage=None, model=None):
+        """Send one chat completion request and return the reply text
+
+        ``usage`` holds the estimated prompt breakdown; the prompt, output and
+        cached token counts reported by the API are filled in and recorded.
+        """
+        model = model or self.model
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": text}
+        ]
+        start = time.perf_counter()
+        response = self.client.chat.completions.create(model=model, messages=messages)
+        content = response.choices[0].message.content.strip()
+        if self.router is not None:
+            self.router.record_latency(model, time.perf_counter() - start)
         
-    def translate(self, text, source_lang, target_lang, context=None):
+        self.finish_usage(usage, messages, content, getattr(response, "usage", None))
+        return content
+
+    def finish_usage(self, usage, messages, content, api_usage):
+        """Fill in a request's prompt, output and cached token counts and record them
+
+        Counts reported by the API are used when present, estimates otherwise.
+        """
+        usage = usage or TokenUsage()
+        usage.requests = 1
+        if api_usage is not None:
+            usage.prompt = api_usage.prompt_tokens
+            usage.output = api_usage.completion_tokens
+            details = getattr(api_usage, "prompt_tokens_details", None)
+            usage.cached = getattr(details, "cached_tokens", 0) or 0
+        else:
+            usage.prompt = self.token_counter.count_messages(messages)
+            usage.output = self.token_counter.count(content)
+        self.record_usage(usage)
+        return usage
+
+    def lookup(self, text, source_lang, target_lang, model, fingerprint=""):
+        """Get a translation from the cache or a translation pack, or None
+
+        Packed translations are copied into the cache on first use.
+        """
+        translation = self.cache.get(text, source_lang, target_lang, model, fingerprint)
+        if translation is not None:
+            return translation
+        for pack in self.packs:
+            translation = pack.get(text, source_lang, target_lang, model, fingerprint)
+            if translation is not None:
+                with self.usage_lock:
+                    self.pack_hits += 1
+                self.cache.put(text, source_lang, target_lang, model, translation, fingerprint, from_pack=True)
+                return translation
+        return None
+
+    def close_packs(self):
+        """Unmap the translation packs, e.g. before one of their files is replaced
+
+        Later lookups only use the cache.
+        """
+        packs, self.packs = self.packs, []
+        for pack in packs:
+            pack.close()
+
+    def translate(self, text, source_lang, target_lang, context=None, region=None):
         """Translate text using OpenAI API"""
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": self.get_translation_prompt(source_lang, target_lang, context)
-                    },
-                    {"role": "user", "content": text}
-                ]
-            )
-            
-            translation = response.choices[0].message.content.strip()
+            model = self.select_model(text)
+            translation = self.lookup(text, source_lang, target_lang, model, self.fingerprint(text, context))
+            if translation is None:
+                translation = self.translate_uncached(
+                    text, source_lang, target_lang, context, self.get_history(region), model
+                )
+            self.remember(region, [(text, translation)])
             return translation
             
         except Exception as e:
             logger.error(f"Error in translation: {str(e)}")
             raise
+
+    def translate_uncached(self, text, source_lang, target_lang, context=None, history=None, model=None, store=True):
+        """Translate text with an API request and, with ``store``, cache the result"""
+        model = model or self.model
+        system_prompt, usage = self.prepare_request(text, source_lang, target_lang, context, history)
+        translation = self.complete(system_prompt, text, usage, model)
+        if store:
+            self.cache.put(text, source_lang, target_lang, model, translation, self.fingerprint(text, context))
+        return translation
+
+    def get_history(self, region):
+        """Get the dialogue history of a capture region, if rolling context is enabled"""
+        if self.conversation is None or region is None:
+            return None
+        return self.conversation.render(region)
+
+    def remember(self, region, pairs):
+        """Add translated lines to the dialogue history of a capture region"""
+        if self.conversation is not None and region is not None:
+            self.conversation.add(region, pairs)
+
+    def translate_lines(self, lines, source_lang, target_lang, context=None, region=None, deferred=False):
+        """Translate a list of lines, sending only uncached lines in a single request
+
+        Returns translations in the same order as ``lines``. With rolling
+        context enabled, ``region`` selects the dialogue history to include.
+        The model is routed on all lines together so a capture stays on one
+        model and its lines keep hitting the cache. Lines the segment filter
+        skips are returned unchanged and left out of the dialogue history.
+
+        With ``deferred``, returns ``(results, commit)`` instead and leaves
+        the cache, the segment filter and the dialogue history untouched
+        until ``commit()`` is called, so a speculative translation of text
+        that is still changing leaves no trace.
+        """
+        segment_filter = self.segment_filter
+        model = self.select_model("\n".join(lines))
+        results = [None] * len(lines)
+        fingerprints = [""] * len(lines)
+        skips = []
+        translated = []
+        pending = {}
+        for index, line in enumerate(lines):
+            if segment_filter is not None:
+                reason = segment_filter.classify(line, source_lang, target_lang)
+                if reason is not None:
+                    results[index] = line
+                    skips.append(reason)
+                    continue
+            fingerprints[index] = self.fingerprint(line, context)
+            if segment_filter is not None:
+                static = segment_filter.get_static(line, source_lang, target_lang, fingerprints[index])
+                if static is not None:
+                    results[index] = static
+                    translated.append(index)
+                    skips.append("static")
+                    continue
+            
+            translated.append(index)
+            cached = self.lookup(line, source_lang, target_lang, model, fingerprints[index])
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.setdefault(line, []).append(index)
+
+        fresh = []
+        if pending:
+            texts = list(pending)
+            history = self.get_history(region)
+            if len(texts) == 1:
+                translations = [
+                    self.translate_uncached(texts[0], source_lang, target_lang, context, history, model, store=False)
+                ]
+            else:
+                translations = self.translate_batch(
+                    texts, source_lang, target_lang, context, history, model, store=False
+                )
+
+            for text, translation in zip(texts, translations):
+                fresh.append((text, translation))
+                for index in pending[text]:
+                    results[index] = translation
+
+        def commit():
+            for text, translation in fresh:
+                self.cache.put(text, source_lang, target_lang, model, translation, self.fingerprint(text, context))
+            if segment_filter is not None:
+                segment_filter.observe(lines, source_lang, target_lang)
+                for reason in skips:
+                    segment_filter.count_skip(reason)
+                for index in translated:
+                    segment_filter.pin(lines[index], source_lang, target_lang, results[index], fingerprints[index])
+            self.remember(region, [(lines[index], results[index]) for index in translated])
+
+        if deferred:
+            return results, commit
+        commit()
+        return results
+
+    def translate_lines_multi(self, lines, source_lang, target_langs, context=None, region=None, deferred=False,
+                              run=NULL_RUN):
+        """Translate lines into several target languages at once
+
+        Each language is translated by a concurrent ``translate_lines`` call,
+        so one OCR result serves every language and each language keeps its
+        own cache entries and dialogue history. Returns a dict of target
+        language to translations in the order of ``lines``, or with
+        ``deferred`` that dict and a ``commit`` for all languages, as in
+        ``translate_lines``. ``run`` profiles the per-language calls made on
+        the fanout threads.
+        """
+        target_langs = list(dict.fromkeys(target_langs))
+        if len(target_langs) == 1:
+            target_lang = target_langs[0]
+            outcomes = {target_lang: self.translate_lines(lines, source_lang, target_lang, context, region, deferred)}
+        else:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=self.fanout_workers, thread_name_prefix="fanout")
+            futures = {
+                target_lang: self.executor.submit(
+                    run.profiled(self.translate_lines),
+                    lines,
+                    source_lang,
+                    target_lang,
+                    context,
+                    f"{region}:{target_lang}" if region is not None else None,
+                    deferred
+                )
+                for target_lang in target_langs
+            }
+            outcomes = {target_lang: future.result() for target_lang, future in futures.items()}
+        if not deferred:
+            return outcomes
+
+        commits = [commit for _, commit in outcomes.values()]
+
+        def commit():
+            for language_commit in commits:
+                language_commit()
+
+        return {target_lang: results for target_lang, (results, _) in outcomes.items()}, commit
+
+    def translate_batch(self, texts, source_lang, target_lang, context=None, history=None, model=None, store=True):
+        """Translate several lines in one numbered request and, with ``store``, cache each line"""
+        try:
+            model = model or self.model
+            numbered = "\n".join(f"[{i + 1}] {' '.join(text.split())}" for i, text in enumerate(texts))
+            system_prompt, usage = self.prepare_request(numbered, source_lang, target_lang, context, history)
+            reply = self.complete(system_prompt, numbered, usage, model)
+
+            parsed = {int(number): line.strip() for number, line in NUMBERED_LINE.findall(reply)}
+            if sorted(parsed) != list(range(1, len(texts) + 1)):
+                logger.warning("Batched translation reply did not match the input lines, translating one by one")
+                return [
+                    self.translate_uncached(text, source_lang, target_lang, context, history, model, store)
+                    for text in texts
+                ]
+
+            translations = [parsed[i + 1] for i in range(len(texts))]
+            if store:
+                for text, translation in zip(texts, translations):
+                    self.cache.put(text, source_lang, target_lang, model, translation, self.fingerprint(text, context))
+            return translations
+
+        except Exception as e:
+            logger.error(f"Error in batch translation: {str(e)}")
+            raise
+
+    def get_async_client(self):
+        """Get the async client and request semaphore, created on the running loop
+
+        Both belong to the loop that first uses them, so async calls should
+        all run on one loop, such as the shared loop behind ``submit``.
+        """
+        if self.async_client is None:
+            self.async_client = AsyncOpenAI(api_key=self.api_key)
+        if self.request_semaphore is None:
+            self.request_semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        return self.async_client
+
+    async def complete_async(self, system_prompt, text, usage=None, model=None):
+        """Async counterpart of ``complete``, bounded by the request semaphore"""
+        model = model or self.model
+        client = self.get_async_client()
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": text}
+        ]
+        async with self.request_semaphore:
+            start = time.perf_counter()
+            response = await client.chat.completions.create(model=model, messages=messages)
+        content = response.choices[0].message.content.strip()
+        if self.router is not None:
+            self.router.record_latency(model, time.perf_counter() - start)
+        
+        self.finish_usage(usage, messages, content, getattr(response, "usage", None))
+        return content
+
+    async def translate_async(self, text, source_lang, target_lang, context=None, region=None):
+        """Translate text without blocking the event loop
+
+        Uses the same cache, packs, glossary, routing and dialogue history as
+        ``translate``. Cancelling the task cancels the in-flight request.
+        """
+        try:
+            model = self.select_model(text)
+            fingerprint = self.fingerprint(text, context)
+            translation = self.lookup(text, source_lang, target_lang, model, fingerprint)
+            if translation is None:
+                system_prompt, usage = self.prepare_request(
+                    text, source_lang, target_lang, context, self.get_history(region)
+                )
+                translation = await self.complete_async(system_prompt, text, usage, model)
+                self.cache.put(text, source_lang, target_lang, model, translation, fingerprint)
+            self.remember(region, [(text, translation)])
+            return translation
+            
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in async translation: {str(e)}")
+            raise
+
+    async def translate_many_async(self, texts, source_lang, target_lang, context=None):
+        """Translate many texts concurrently, returning translations in the order of ``texts``
+
+        Each distinct text is requested once. Cancelling the call cancels every
+        request still in flight.
+        """
+        unique = list(dict.fromkeys(texts))
+        translations = await asyncio.gather(*(
+            self.translate_async(text, source_lang, target_lang, context) for text in unique
+        ))
+        by_text = dict(zip(unique, translations))
+        return [by_text[text] for text in texts]
+
+    async def translate_stream_async(self, text, source_lang, target_lang, context=None, region=None):
+        """Translate text as a stream, yielding pieces of the translation as they arrive
+
+        A cached translation is yielded whole. The complete translation is
+        cached once the stream finishes; a stream that is closed early is not
+        cached. The response is read into a queue by a separate task, so the
+        request slot is released as soon as the HTTP stream ends, however
+        slowly the pieces are consumed. Callers that stop iterating early
+        should close the generator (e.g. with ``contextlib.aclosing``) to
+        cancel the request; otherwise it runs to completion in the background.
+        """
+        model = self.select_model(text)
+        fingerprint = self.fingerprint(text, context)
+        translation = self.lookup(text, source_lang, target_lang, model, fingerprint)
+        if translation is not None:
+            self.remember(region, [(text, translation)])
+            yield translation
+            return
+        
+        client = self.get_async_client()
+        system_prompt, usage = self.prepare_request(text, source_lang, target_lang, context, self.get_history(region))
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": text}
+        ]
+        received = asyncio.Queue()
+        
+        async def receive():
+            api_usage = None
+            async with self.request_semaphore:
+                start = time.perf_counter()
+                stream = await client.chat.completions.create(
+                    model=model, messages=messages, stream=True, stream_options={"include_usage": True}
+                )
+                async for chunk in stream:
+                    api_usage = getattr(chunk, "usage", None) or api_usage
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        received.put_nowait(chunk.choices[0].delta.content)
+            if self.router is not None:
+                self.router.record_latency(model, time.perf_counter() - start)
+            return api_usage
+        
+        task = asyncio.ensure_future(receive())
+        # None marks the end of the stream, whether it finished, failed or was cancelled
+        task.add_done_callback(lambda _: received.put_nowait(None))
+        pieces = []
+        try:
+            while True:
+                piece = await received.get()
+                if piece is None:
+                    break
+                pieces.append(piece)
+                yield piece
+            api_usage = await task
+        finally:
+            task.cancel()
+        
+        translation = "".join(pieces).strip()
+        self.finish_usage(usage, messages, translation, api_usage)
+        self.cache.put(text, source_lang, target_lang, model, translation, fingerprint)
+        self.remember(region, [(text, translation)])
+
+    def submit(self, coroutine):
+        """Run a coroutine, e.g. ``translate_async(...)``, on the shared event loop
+
+        Safe to call from any thread, including the Tk thread. Returns a
+        ``concurrent.futures.Future``; cancelling it cancels the coroutine.
+        """
+        return get_shared_loop().submit(coroutine)
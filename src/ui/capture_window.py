@@ -2,10 +2,8 @@
 Capture window implementation for screen capture functionality
 """
 import customtkinter as ctk
-from PIL import Image
-import win32gui
-import win32ui
-import win32con
+from services.capture_backend import create_capture_backend
+from services.session_recorder import SessionRecorder, timestamped_path
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,6 +12,9 @@ class CaptureWindow(ctk.CTkToplevel):
     def __init__(self, app):
         super().__init__()
         self.app = app
+        self.backend = None
+        self.recorder = None
+        self.recording_failed = False
         self.setup_window()
         self.setup_ui()
         
@@ -92,8 +93,55 @@ class CaptureWindow(ctk.CTkToplevel):
         except Exception as e:
             logger.error(f"Error in on_resize: {str(e)}")
             
-    def capture_screenshot(self):
-        """Capture the screen area within the window"""
+    def get_backend(self):
+        """Get the capture backend, creating it on first use"""
+        if self.backend is None:
+            self.backend = create_capture_backend(self.app.settings.get("capture_backend"))
+        return self.backend
+
+    def get_recorder(self):
+        """Get the session recorder if recording is enabled, creating it on first use
+
+        Each recording goes to a new file named after the ``session_recording``
+        setting and the time it started. Recording is only a diagnostic, so if
+        the file cannot be created it stays off for this window and captures
+        carry on without it.
+        """
+        path = self.app.settings.get("session_recording")
+        if self.recorder is None and path and not self.recording_failed:
+            try:
+                self.recorder = SessionRecorder(timestamped_path(path))
+            except Exception as e:
+                logger.error(f"Error starting session recording, recording disabled: {str(e)}")
+                self.recording_failed = True
+        return self.recorder
+
+    def grab(self, x, y, width, height):
+        """Grab the area from the backend and add it to the session recording"""
+        frame = self.get_backend().grab(x, y, width, height)
+        recorder = self.get_recorder()
+        if recorder is not None and frame is not None:
+            recorder.record(frame)
+        return frame
+
+    def destroy(self):
+        """Release capture resources before destroying the window"""
+        if self.backend is not None:
+            self.backend.close()
+            self.backend = None
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+        super().destroy()
+
+    def capture_screenshot(self, hide_windows=True):
+        """Capture the screen area within the window
+
+        With ``hide_windows`` false the main window stays visible, and the
+        capture window is only hidden for backends whose frames include
+        layered windows. Returns an RGB numpy array owned by the backend's
+        frame ring; copy it if it has to outlive the next few captures.
+        """
         try:
             self.update_idletasks()
             
@@ -103,47 +151,25 @@ class CaptureWindow(ctk.CTkToplevel):
             width = self.winfo_width()
             height = self.winfo_height()
             
+            if hide_windows:
+                windows = [self, self.app]
+            elif self.get_backend().captures_layered_windows:
+                windows = [self]
+            else:
+                return self.grab(x, y, width, height)
+            
             # Hide windows
-            self.withdraw()
-            self.app.root.withdraw()
-            self.app.root.update_idletasks()
+            for window in windows:
+                window.withdraw()
+            self.app.update_idletasks()
             
             try:
-                # Setup screen capture
-                hwin = win32gui.GetDesktopWindow()
-                hwindc = win32gui.GetWindowDC(hwin)
-                srcdc = win32ui.CreateDCFromHandle(hwindc)
-                memdc = srcdc.CreateCompatibleDC()
-                
-                # Create bitmap
-                bmp = win32ui.CreateBitmap()
-                bmp.CreateCompatibleBitmap(srcdc, width, height)
-                memdc.SelectObject(bmp)
-                
-                # Copy screen
-                memdc.BitBlt((0, 0), (width, height), srcdc, (x, y), win32con.SRCCOPY)
-                
-                # Convert to PIL Image
-                bmpinfo = bmp.GetInfo()
-                bmpstr = bmp.GetBitmapBits(True)
-                img = Image.frombuffer(
-                    'RGB',
-                    (bmpinfo['bmWidth'], bmpinfo['bmHeight']),
-                    bmpstr, 'raw', 'BGRX', 0, 1
-                )
-                
-                return img
+                return self.grab(x, y, width, height)
                 
             finally:
-                # Cleanup
-                memdc.DeleteDC()
-                srcdc.DeleteDC()
-                win32gui.ReleaseDC(hwin, hwindc)
-                win32gui.DeleteObject(bmp.GetHandle())
-                
                 # Show windows
-                self.app.root.deiconify()
-                self.deiconify()
+                for window in reversed(windows):
+                    window.deiconify()
                 
         except Exception as e:
             logger.error(f"Error in capture_screenshot: {str(e)}")
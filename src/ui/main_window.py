@@ -2,15 +2,36 @@
 Main application window implementation
 """
 import customtkinter as ctk
-from services.translation_service import TranslationService
-from services.ocr_service import OCRService
+from services.translation_service import TranslationService, DEFAULT_MODEL
+from services.ocr_service import OCRService, AUTO_SOURCE
+from services.glossary import Glossary
+from services.conversation_context import ConversationMemory
+from services.model_router import ModelRouter
+from services.segment_filter import SegmentFilter
+from services.capture_controller import AdaptiveCaptureController
+from services.text_stability import TextStabilityTracker
+from services.memory_watchdog import MemoryWatchdog
+from services.translation_pack import TranslationPack, export_cache
 from utils.settings_manager import SettingsManager
+from utils.profiler import PipelineProfiler, NULL_RUN
+from utils.thread_budget import plan_thread_budget, pin_to_cores
 from ui.settings_window import SettingsWindow
 from ui.capture_window import CaptureWindow
+from ui.update_dispatcher import UIUpdateDispatcher
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 import logging
+import queue
+import threading
+import time
 
 logger = logging.getLogger(__name__)
 
+LANGUAGES = ['English', 'Japanese', 'Korean', 'Chinese (Simplified)', 'Chinese (Traditional)']
+
+# Dialogue history and script detection key for the single capture window
+CAPTURE_REGION = "capture"
+
 class TranslatorApp(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -20,14 +41,40 @@ class TranslatorApp(ctk.CTk):
         self.settings = self.settings_manager.load_settings()
         self.api_key = self.settings.get("api_key")
         self.capture_window = None
+        self.profiler = PipelineProfiler.from_settings(self.settings)
+        self.ui_updates = UIUpdateDispatcher(self, self.settings.get("ui_update_interval_ms", 16))
+        self.thread_budget = plan_thread_budget(
+            self.settings.get("thread_budget", 0),
+            self.settings.get("ocr_cores")
+        )
+        
+        # Watch mode state
+        self.watching = False
+        self.watch_after = None
+        self.ocr_executor = None
+        self.translation_executor = None
+        self.watch_results = queue.Queue()
+        self.capture_controller = None
+        self.text_tracker = None
+        self.watch_last_result = None
+        self.watch_session = 0
+        self.speculation = None
+        self.settled = None
+        self.speculation_lock = threading.Lock()
         
         # Initialize language variables
         self.source_lang_var = ctk.StringVar(value="Japanese")
         self.target_lang_var = ctk.StringVar(value="English")
+        self.rolling_context_var = ctk.BooleanVar(value=self.settings.get("rolling_context", False))
+        self.extra_target_vars = {
+            lang: ctk.BooleanVar(value=lang in self.settings.get("extra_target_languages", []))
+            for lang in LANGUAGES
+        }
         
         # Setup window properties
         self.title("Screen Translator")
-        self.geometry("400x600")
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.geometry("400x720")
         
         # Initialize UI
         self.setup_ui()
@@ -43,41 +90,146 @@ class TranslatorApp(ctk.CTk):
         """Check if API key is present and valid"""
         return bool(self.api_key)
         
+    def load_translation_packs(self):
+        """Open the translation packs listed in the settings, skipping unreadable ones"""
+        packs = []
+        for path in self.settings.get("translation_packs", []):
+            try:
+                packs.append(TranslationPack(path))
+                logger.info(f"Loaded translation pack {path} with {len(packs[-1])} entries")
+            except Exception as e:
+                logger.error(f"Error loading translation pack {path}: {str(e)}")
+        return packs
+        
+    def on_close(self):
+        """Save the translation cache to a pack if configured, then close the app"""
+        if self.watching:
+            self.stop_watch()
+        export_path = self.settings.get("translation_pack_export")
+        translation_service = getattr(self, "translation_service", None)
+        if translation_service is not None:
+            # The export may replace a loaded pack, which Windows refuses while it is mapped
+            translation_service.close_packs()
+        if export_path and translation_service is not None and translation_service.cache.unsaved:
+            try:
+                export_cache(translation_service.cache, export_path)
+            except Exception as e:
+                logger.error(f"Error exporting translation cache: {str(e)}")
+        if self.capture_window is not None and self.capture_window.winfo_exists():
+            self.capture_window.destroy()
+        # No pending UI update may run on the destroyed root
+        self.ui_updates.cancel()
+        self.destroy()
+        
+    def shutdown_services(self):
+        """Stop the memory watchdog and free the OCR models of the current services"""
+        memory_watchdog = getattr(self, "memory_watchdog", None)
+        if memory_watchdog is not None:
+            memory_watchdog.stop()
+            self.memory_watchdog = None
+        ocr_service = getattr(self, "ocr_service", None)
+        if ocr_service is not None:
+            ocr_service.unload_models()
+        
     def setup_services(self):
-        """Initialize OCR and translation services"""
+        """Initialize OCR and translation services, replacing any existing ones"""
         try:
-            self.ocr_service = OCRService()
+            self.shutdown_services()
+            self.ocr_service = OCRService(
+                quantization=self.settings.get("ocr_quantization", "int8"),
+                quantize_detector=self.settings.get("ocr_quantize_detector", False),
+                model_cache_dir=self.settings.get("model_cache_dir"),
+                engine=self.settings.get("ocr_engine", "torch"),
+                intra_op_threads=self.settings.get("ocr_intra_op_threads") or self.thread_budget.ocr_threads,
+                inter_op_threads=self.settings.get("ocr_inter_op_threads") or self.thread_budget.interop_threads,
+                recognition_batch_size=self.settings.get("ocr_batch_size", 16),
+                coarse_scale=self.settings.get("ocr_coarse_scale", 1.0),
+                refine_confidence=self.settings.get("ocr_refine_confidence", 0.5),
+                refine_scale=self.settings.get("ocr_refine_scale", 1.0),
+                min_confidence=self.settings.get("ocr_min_confidence", 0.0),
+                probe_crops=self.settings.get("ocr_probe_crops", 3),
+                script_change_threshold=self.settings.get("ocr_script_change_threshold", 0.1),
+                roi_tracking=self.settings.get("ocr_roi_tracking", False)
+            )
             
             if not self.api_key:
                 logger.warning("No API key found in settings")
                 self.show_api_key_error()
                 return
                 
-            self.translation_service = TranslationService(self.api_key)
+            glossary_file = self.settings.get("glossary_file")
+            model = self.settings.get("model", DEFAULT_MODEL)
+            router = None
+            if model == "auto":
+                model = DEFAULT_MODEL
+                router = ModelRouter(model, self.settings.get("model_routes"))
+            
+            self.translation_service = TranslationService(
+                self.api_key,
+                model=model,
+                glossary=Glossary.load(glossary_file) if glossary_file else None,
+                max_context_tokens=self.settings.get("max_context_tokens", 512),
+                conversation=ConversationMemory(self.settings.get("rolling_context_tokens", 256)),
+                router=router,
+                fanout_workers=self.thread_budget.fanout_workers,
+                packs=self.load_translation_packs(),
+                segment_filter=(
+                    SegmentFilter(self.settings.get("static_label_captures", 5))
+                    if self.settings.get("segment_filter", True) else None
+                )
+            )
             logger.info("Services initialized successfully")
             
-            # Enable UI elements
-            self.enable_ui()
+            # Free the OCR models while idle or when memory runs high
+            self.memory_watchdog = MemoryWatchdog(
+                self.ocr_service,
+                idle_timeout=self.settings.get("ocr_idle_unload_seconds", 600),
+                max_rss_mb=self.settings.get("max_rss_mb", 0),
+                caches=[self.translation_service.cache]
+            )
+            self.memory_watchdog.start()
+            
+            # Enable UI elements once the OCR models are warm
+            self.ocr_service.warm_up([self.source_lang_var.get()])
+            self.set_status("Warming up OCR...", "blue")
+            self.check_ocr_ready()
             
         except Exception as e:
             logger.error(f"Error initializing services: {str(e)}")
             self.show_error_message(str(e))
             
+    def check_ocr_ready(self):
+        """Enable the UI once OCR warm-up has finished"""
+        if not self.ocr_service.ready.is_set():
+            self.after(200, self.check_ocr_ready)
+            return
+        
+        self.enable_ui()
+        self.set_status("Ready", "blue")
+        
     def enable_ui(self):
         """Enable UI elements after successful API key validation"""
         self.source_lang_combo.configure(state="normal")
         self.target_lang_combo.configure(state="normal")
+        for check in self.extra_target_checks:
+            check.configure(state="normal")
         self.translate_btn.configure(state="normal")
         self.context_text.configure(state="normal")
+        self.rolling_context_check.configure(state="normal")
         self.show_capture_btn.configure(state="normal")
+        self.watch_switch.configure(state="normal")
         
     def disable_ui(self):
         """Disable UI elements when API key is invalid"""
         self.source_lang_combo.configure(state="disabled")
         self.target_lang_combo.configure(state="disabled")
+        for check in self.extra_target_checks:
+            check.configure(state="disabled")
         self.translate_btn.configure(state="disabled")
         self.context_text.configure(state="disabled")
+        self.rolling_context_check.configure(state="disabled")
         self.show_capture_btn.configure(state="disabled")
+        self.watch_switch.configure(state="disabled")
     
     def setup_ui(self):
         """Setup the main window UI components"""
@@ -112,6 +264,14 @@ class TranslatorApp(ctk.CTk):
             state="disabled"
         )
         self.show_capture_btn.grid(row=0, column=1, padx=5, pady=5)
+        
+        self.watch_switch = ctk.CTkSwitch(
+            self.menu_frame,
+            text="Watch",
+            command=self.toggle_watch,
+            state="disabled"
+        )
+        self.watch_switch.grid(row=0, column=2, padx=5, pady=5)
     
     def setup_language_selection(self):
         """Setup language selection dropdowns"""
@@ -121,7 +281,7 @@ class TranslatorApp(ctk.CTk):
         
         self.source_lang_combo = ctk.CTkOptionMenu(
             self,
-            values=['English', 'Japanese', 'Korean', 'Chinese (Simplified)', 'Chinese (Traditional)'],
+            values=[AUTO_SOURCE] + LANGUAGES,
             variable=self.source_lang_var,
             state="disabled"
         )
@@ -133,16 +293,34 @@ class TranslatorApp(ctk.CTk):
         
         self.target_lang_combo = ctk.CTkOptionMenu(
             self,
-            values=['English', 'Japanese', 'Korean', 'Chinese (Simplified)', 'Chinese (Traditional)'],
+            values=LANGUAGES,
             variable=self.target_lang_var,
             state="disabled"
         )
         self.target_lang_combo.grid(row=5, column=0, pady=(0,10), padx=10, sticky="ew")
+        
+        # Additional target languages translated from the same capture
+        self.extra_targets_frame = ctk.CTkFrame(self)
+        self.extra_targets_frame.grid(row=6, column=0, sticky="ew", padx=10, pady=5)
+        
+        self.extra_targets_label = ctk.CTkLabel(self.extra_targets_frame, text="Also translate to:", anchor="w")
+        self.extra_targets_label.grid(row=0, column=0, columnspan=2, sticky="w", padx=5, pady=(5,0))
+        
+        self.extra_target_checks = []
+        for index, lang in enumerate(LANGUAGES):
+            check = ctk.CTkCheckBox(
+                self.extra_targets_frame,
+                text=lang,
+                variable=self.extra_target_vars[lang],
+                state="disabled"
+            )
+            check.grid(row=1 + index // 2, column=index % 2, sticky="w", padx=5, pady=2)
+            self.extra_target_checks.append(check)
     
     def setup_context_frame(self):
         """Setup the context input frame"""
         self.context_frame = ctk.CTkFrame(self)
-        self.context_frame.grid(row=6, column=0, sticky="ew", padx=10, pady=5)
+        self.context_frame.grid(row=7, column=0, sticky="ew", padx=10, pady=5)
         self.context_frame.grid_columnconfigure(0, weight=1)
         
         self.context_label = ctk.CTkLabel(
@@ -162,15 +340,24 @@ class TranslatorApp(ctk.CTk):
         self.context_text.insert("1.0", "Add context to help with translation accuracy...")
         self.context_text.bind("<FocusIn>", self.clear_context_placeholder)
         self.context_text.bind("<FocusOut>", self.restore_context_placeholder)
+        
+        self.rolling_context_check = ctk.CTkCheckBox(
+            self.context_frame,
+            text="Remember recent dialogue",
+            variable=self.rolling_context_var,
+            command=self.toggle_rolling_context,
+            state="disabled"
+        )
+        self.rolling_context_check.grid(row=2, column=0, sticky="w", padx=5, pady=(0,5))
     
     def setup_translation_frame(self):
         """Setup the translation result frame"""
         self.translation_frame = ctk.CTkFrame(self)
-        self.translation_frame.grid(row=7, column=0, sticky="nsew", padx=10, pady=5)
+        self.translation_frame.grid(row=8, column=0, sticky="nsew", padx=10, pady=5)
         self.translation_frame.grid_columnconfigure(0, weight=1)
         self.translation_frame.grid_rowconfigure(0, weight=1)
         
-        self.grid_rowconfigure(7, weight=1)
+        self.grid_rowconfigure(8, weight=1)
         
         self.translation_text = ctk.CTkTextbox(
             self.translation_frame,
@@ -187,7 +374,7 @@ class TranslatorApp(ctk.CTk):
             command=self.capture_and_translate,
             state="disabled"
         )
-        self.translate_btn.grid(row=8, column=0, pady=10, padx=10, sticky="ew")
+        self.translate_btn.grid(row=9, column=0, pady=10, padx=10, sticky="ew")
     
     def setup_status_label(self):
         """Setup the status label"""
@@ -196,7 +383,7 @@ class TranslatorApp(ctk.CTk):
             text="",
             text_color="blue"
         )
-        self.status_label.grid(row=9, column=0, pady=10, padx=10, sticky="ew")
+        self.status_label.grid(row=10, column=0, pady=10, padx=10, sticky="ew")
     
     def clear_context_placeholder(self, event):
         if self.context_text.get("1.0", "end-1c") == "Add context to help with translation accuracy...":
@@ -219,48 +406,305 @@ class TranslatorApp(ctk.CTk):
         self.capture_window.deiconify()
         self.capture_window.lift()
     
+    def toggle_rolling_context(self):
+        """Start the dialogue history afresh whenever rolling context is toggled"""
+        self.translation_service.conversation.clear()
+    
+    def get_region(self):
+        """Get the dialogue history key, or None when rolling context is off"""
+        return CAPTURE_REGION if self.rolling_context_var.get() else None
+    
+    def get_context(self):
+        """Get the user context, ignoring the placeholder text"""
+        context = self.context_text.get("1.0", "end-1c")
+        if context == "Add context to help with translation accuracy...":
+            context = ""
+        return context
+    
+    def get_target_langs(self):
+        """Get the selected target language followed by any additional ones"""
+        target_lang = self.target_lang_var.get()
+        extra = [lang for lang, var in self.extra_target_vars.items() if var.get() and lang != target_lang]
+        return [target_lang] + extra
+    
+    def translate_frame(self, frame, source_lang, target_langs, context, region=None, run=NULL_RUN):
+        """Run OCR and translation on a captured frame
+
+        Returns the laid-out translation, or None if no text was found.
+        ``run`` profiles the OCR and translation stages separately. One-shot
+        captures always search the whole frame for text.
+        """
+        with run.stage("ocr"):
+            if self.thread_budget.ocr_cores:
+                # Run on the pinned OCR thread so torch's threads stay on the OCR cores
+                result = self.get_ocr_executor().submit(
+                    run.profiled(self.ocr_service.perform_structured_ocr), frame, source_lang, CAPTURE_REGION, True
+                ).result()
+            else:
+                result = self.ocr_service.perform_structured_ocr(frame, source_lang, CAPTURE_REGION, full_detection=True)
+        if not result:
+            return None
+        with run.stage("translate"):
+            return self.translate_result(result, source_lang, target_langs, context, region, run=run)
+    
+    def translate_result(self, result, source_lang, target_langs, context, region=None, deferred=False, run=NULL_RUN):
+        """Translate an OCR result into each target language, laid out like the source
+
+        With ``deferred``, returns ``(translation, commit)`` and nothing is
+        cached or remembered until ``commit()`` is called. ``run`` profiles
+        translations made on worker threads.
+        """
+        # In auto mode the OCR pass identified the language
+        source_lang = result.language or source_lang
+        
+        # Translate line by line so unchanged lines are served from the cache
+        lines = [line.text for line in result.lines]
+        translations = self.translation_service.translate_lines_multi(
+            lines, source_lang, target_langs, context, region, deferred, run
+        )
+        if deferred:
+            translations, commit = translations
+            return self.render_translations(result, translations, target_langs), commit
+        return self.render_translations(result, translations, target_langs)
+    
+    def render_translations(self, result, translations, target_langs):
+        """Lay out each target language's translations like the source"""
+        if len(translations) == 1:
+            return result.render(translations[target_langs[0]])
+        return "\n\n".join(
+            f"[{target_lang}]\n{result.render(lang_translations)}"
+            for target_lang, lang_translations in translations.items()
+        )
+    
     def capture_and_translate(self):
         """Handle the capture and translation process"""
+        with self.profiler.run() as run:
+            self.run_capture_and_translate(run)
+    
+    def run_capture_and_translate(self, run=NULL_RUN):
+        """Capture, OCR and translate the capture area, profiling each stage with ``run``"""
         try:
             if self.capture_window is None or not self.capture_window.winfo_exists():
                 self.capture_window = CaptureWindow(self)
             
             # Get the screenshot
-            screenshot = self.capture_window.capture_screenshot()
+            with run.stage("capture"):
+                screenshot = self.capture_window.capture_screenshot()
             if screenshot is None:
                 return
             
             # Get context and languages
-            context = self.context_text.get("1.0", "end-1c")
-            if context == "Add context to help with translation accuracy...":
-                context = ""
-            
+            context = self.get_context()
             source_lang = self.source_lang_var.get()
-            target_lang = self.target_lang_var.get()
+            target_langs = self.get_target_langs()
             
-            # Perform OCR
-            self.status_label.configure(text="Performing OCR...")
-            text = self.ocr_service.perform_ocr(screenshot, source_lang)
+            # Perform OCR and translation
+            self.set_status("Translating...")
+            translation = self.translate_frame(screenshot, source_lang, target_langs, context, self.get_region(), run)
             
-            if not text:
+            if translation is None:
                 self.update_translation("No text was detected in the captured area")
                 return
             
-            # Translate text
-            self.status_label.configure(text="Translating...")
-            translation = self.translation_service.translate(text, source_lang, target_lang, context)
-            
             # Update UI
             self.update_translation(translation)
-            self.status_label.configure(text="Done")
+            self.set_status("Done")
             
         except Exception as e:
             logger.error(f"Error in capture_and_translate: {str(e)}")
             self.update_translation(f"Error: {str(e)}")
-            self.status_label.configure(text="Error occurred")
+            self.set_status("Error occurred")
+    
+    def toggle_watch(self):
+        """Start or stop watch mode from the watch switch"""
+        if self.watch_switch.get():
+            self.start_watch()
+        else:
+            self.stop_watch()
+    
+    def get_ocr_executor(self):
+        """Get the OCR worker thread, pinned to the configured OCR cores"""
+        if self.ocr_executor is None:
+            self.ocr_executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="ocr",
+                initializer=pin_to_cores,
+                initargs=(self.thread_budget.ocr_cores,)
+            )
+        return self.ocr_executor
+    
+    def start_watch(self):
+        """Continuously capture and translate the capture area"""
+        self.show_capture_window()
+        self.capture_controller = AdaptiveCaptureController(
+            min_fps=self.settings.get("watch_min_fps", 1.0),
+            max_fps=self.settings.get("watch_max_fps", 10.0),
+            cpu_budget=self.settings.get("watch_cpu_budget", 0.5)
+        )
+        self.text_tracker = TextStabilityTracker(
+            stable_frames=self.settings.get("watch_stable_frames", 3),
+            speculate=self.settings.get("watch_speculate", True)
+        )
+        self.watch_last_result = None
+        self.watch_session += 1
+        with self.speculation_lock:
+            self.speculation = None
+            self.settled = None
+        if self.translation_executor is None:
+            self.translation_executor = ThreadPoolExecutor(
+                max_workers=self.thread_budget.translation_workers,
+                thread_name_prefix="translate"
+            )
+        self.watching = True
+        self.set_status("Watching...")
+        self.watch_tick()
+    
+    def stop_watch(self):
+        """Stop watch mode"""
+        self.watching = False
+        # Cancel the pending tick so a quick restart does not run two tick chains
+        if self.watch_after is not None:
+            self.after_cancel(self.watch_after)
+            self.watch_after = None
+        self.cancel_speculation()
+        self.set_status("")
+    
+    def watch_tick(self):
+        """Capture a frame if the pipeline has room and schedule the next tick"""
+        self.watch_after = None
+        if not self.watching:
+            return
+        
+        self.apply_watch_results()
+        controller = self.capture_controller
+        try:
+            if controller.should_capture():
+                # Keep the main window up; the capture window is only hidden
+                # by backends whose frames include layered windows
+                frame = self.capture_window.capture_screenshot(hide_windows=False)
+                changed = frame is not None and controller.observe_frame(frame)
+                
+                # Unchanged frames skip OCR but still count towards text stability
+                if changed or (frame is not None and self.text_tracker.pending):
+                    # Capture pauses while a frame is in flight, so the ring
+                    # buffer behind this frame is not reused before it is processed
+                    controller.begin_work()
+                    self.get_ocr_executor().submit(
+                        self.process_watch_frame,
+                        self.watch_session,
+                        controller,
+                        frame if changed else None,
+                        self.source_lang_var.get(),
+                        self.get_target_langs(),
+                        self.get_context(),
+                        self.get_region()
+                    )
+        except Exception as e:
+            logger.error(f"Error in watch_tick: {str(e)}")
+        
+        self.watch_after = self.after(max(1, int(controller.next_interval() * 1000)), self.watch_tick)
+    
+    def process_watch_frame(self, session, controller, frame, source_lang, target_langs, context, region):
+        """OCR a watch mode frame on the worker thread and translate text once it settles
+
+        ``frame`` is None when the capture did not change, in which case the
+        previous OCR result is observed again. Translations run on the
+        translation pool, so only the OCR time counts towards the capture
+        controller's CPU budget. Speculative translations are only committed
+        to the cache and dialogue history once their text is stable.
+        """
+        elapsed = 0.0
+        try:
+            if frame is not None:
+                start = time.perf_counter()
+                self.watch_last_result = self.ocr_service.perform_structured_ocr(frame, source_lang, CAPTURE_REGION)
+                elapsed = time.perf_counter() - start
+            result = self.watch_last_result
+            update = self.text_tracker.update(result.text if result else "")
+            
+            if update.cancel:
+                self.cancel_speculation()
+            if update.speculate:
+                future = self.translation_executor.submit(
+                    self.translate_result, result, source_lang, target_langs, context, region, True
+                )
+                with self.speculation_lock:
+                    self.speculation = (update.text, future)
+                
+            if update.stable:
+                # stop_watch may clear the speculation from the Tk thread at any time
+                with self.speculation_lock:
+                    speculation, self.speculation = self.speculation, None
+                if update.use_speculation and speculation is not None:
+                    future = speculation[1]
+                else:
+                    if speculation is not None:
+                        speculation[1].cancel()
+                    future = self.translation_executor.submit(
+                        self.translate_result, result, source_lang, target_langs, context, region, True
+                    )
+                with self.speculation_lock:
+                    self.settled = future
+                future.add_done_callback(partial(self.queue_watch_translation, session))
+                
+        except Exception as e:
+            logger.error(f"Error processing watch frame: {str(e)}")
+            self.watch_results.put((session, f"Error: {str(e)}"))
+        finally:
+            controller.end_work(elapsed)
+    
+    def queue_watch_translation(self, session, future):
+        """Commit a settled translation and hand it to the Tk thread
+
+        Results of older settled text that finish after newer ones are not shown.
+        """
+        if future.cancelled():
+            return
+        try:
+            translation, commit = future.result()
+            commit()
+        except Exception as e:
+            logger.error(f"Error translating watch frame: {str(e)}")
+            translation = f"Error: {str(e)}"
+        with self.speculation_lock:
+            if future is not self.settled:
+                return
+        self.watch_results.put((session, translation))
+    
+    def cancel_speculation(self):
+        """Drop a speculative translation whose text kept changing"""
+        with self.speculation_lock:
+            speculation, self.speculation = self.speculation, None
+        if speculation is not None:
+            # A request already in flight cannot be stopped; its result is discarded
+            speculation[1].cancel()
+    
+    def apply_watch_results(self):
+        """Show the newest translation of the current watch session"""
+        translation = None
+        while True:
+            try:
+                session, result = self.watch_results.get_nowait()
+            except queue.Empty:
+                break
+            if session == self.watch_session:
+                translation = result
+        if translation is not None:
+            self.update_translation(translation)
+    
+    def set_status(self, text, text_color=None):
+        """Update the status label on the next UI frame"""
+        if text_color is None:
+            self.ui_updates.configure(self.status_label, text=text)
+        else:
+            self.ui_updates.configure(self.status_label, text=text, text_color=text_color)
     
     def update_translation(self, text):
-        """Update the translation text box"""
+        """Update the translation text box on the next UI frame, if the text changed"""
+        self.ui_updates.submit(self.translation_text, self.show_translation, text)
+    
+    def show_translation(self, text):
+        """Replace the contents of the translation text box"""
         self.translation_text.configure(state="normal")
         self.translation_text.delete("1.0", "end")
         self.translation_text.insert("1.0", text)
@@ -272,4 +716,4 @@ class TranslatorApp(ctk.CTk):
     
     def show_error_message(self, message):
         """Show error message to user"""
-        self.status_label.configure(text=message, text_color="red")
+        self.set_status(message, "red")
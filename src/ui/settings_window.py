@@ -11,7 +11,7 @@ class SettingsWindow(ctk.CTkToplevel):
         super().__init__(parent)
         self.app = parent  # Get the TranslatorApp instance
         self.title("Settings")
-        self.geometry("400x300")
+        self.geometry("400x400")
         
         # Configure grid
         self.grid_columnconfigure(0, weight=1)
@@ -29,22 +29,30 @@ class SettingsWindow(ctk.CTkToplevel):
         self.show_key = ctk.CTkCheckBox(self, text="Show API Key", command=self.toggle_api_key_visibility)
         self.show_key.grid(row=2, column=0, pady=5, padx=20, sticky="w")
         
-        # Model Selection (for future use)
+        # Model Selection ("auto" routes each request by text size and script)
         self.model_label = ctk.CTkLabel(self, text="Model:")
         self.model_label.grid(row=3, column=0, pady=(20,0), padx=20, sticky="w")
         
-        self.model_var = ctk.StringVar(master=self, value="gpt-4o-mini")
+        self.model_var = ctk.StringVar(master=self, value=self.app.settings.get("model", "gpt-4o-mini"))
         self.model_menu = ctk.CTkOptionMenu(
             self,
-            values=["gpt-4o-mini"],  # Only one model for now
-            variable=self.model_var,
-            state="disabled"  # Disabled for now
+            values=["auto", "gpt-4o-mini", "gpt-4o"],
+            variable=self.model_var
         )
         self.model_menu.grid(row=4, column=0, pady=(5,20), padx=20, sticky="ew")
         
+        # Profiling of the next captures, applied without a restart
+        self.profile_label = ctk.CTkLabel(self, text="Profile next captures:")
+        self.profile_label.grid(row=5, column=0, pady=(0,0), padx=20, sticky="w")
+        
+        self.profile_entry = ctk.CTkEntry(self, width=300, placeholder_text="0")
+        self.profile_entry.grid(row=6, column=0, pady=(5,0), padx=20, sticky="ew")
+        if self.app.profiler.remaining:
+            self.profile_entry.insert(0, str(self.app.profiler.remaining))
+        
         # Save Button
         self.save_btn = ctk.CTkButton(self, text="Save Settings", command=self.save_settings)
-        self.save_btn.grid(row=5, column=0, pady=20, padx=20, sticky="ew")
+        self.save_btn.grid(row=7, column=0, pady=20, padx=20, sticky="ew")
         
     def toggle_api_key_visibility(self):
         """Toggle API key visibility"""
@@ -61,18 +69,26 @@ class SettingsWindow(ctk.CTkToplevel):
             self.show_error("API key is required")
             return
             
-        # Save settings
-        settings = {
+        profile_runs = self.profile_entry.get().strip() or "0"
+        if not profile_runs.isdigit():
+            self.show_error("Profiled captures must be a whole number")
+            return
+            
+        # Save settings, keeping keys that are not edited in this window
+        settings = dict(self.app.settings)
+        settings.update({
             "api_key": api_key,
             "model": self.model_var.get()
-        }
+        })
         
         try:
             # Save to file
             self.app.settings_manager.save_settings(settings)
             
             # Update app settings
+            self.app.settings = settings
             self.app.api_key = api_key
+            self.app.profiler.arm(int(profile_runs))
             self.app.setup_services()  # Reinitialize services with new API key
             
             # Close settings window
@@ -89,4 +105,4 @@ class SettingsWindow(ctk.CTkToplevel):
             text=f"Error: {message}",
             text_color="red"
         )
-        error_label.grid(row=6, column=0, pady=10, padx=20)
+        error_label.grid(row=8, column=0, pady=10, padx=20)
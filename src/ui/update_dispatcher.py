@@ -0,0 +1,70 @@
+"""
+Coalesced, frame-rate limited widget updates
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class UIUpdateDispatcher:
+    """Batches widget updates and applies them at most once per frame
+
+    Updates are keyed per widget; a newer update replaces a pending one, so
+    only the latest state is drawn. Updates that would not change what was
+    last applied are dropped. Call it from the Tk thread only; worker
+    threads hand their results to the Tk thread first, as watch mode does.
+    """
+    def __init__(self, root, interval_ms=16):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.pending = {}
+        self.applied = {}
+        self.scheduled = None
+
+    def submit(self, key, apply, value):
+        """Schedule ``apply(value)``, replacing any pending update with the same key"""
+        if key not in self.pending and key in self.applied and self.applied[key] == value:
+            return
+        self.pending[key] = (apply, value, False)
+        self.schedule()
+
+    def configure(self, widget, **options):
+        """Schedule ``widget.configure(**options)``, merged with pending options for the widget"""
+        _, pending, _ = self.pending.get(widget, (None, {}, True))
+        self.pending[widget] = (widget.configure, {**pending, **options}, True)
+        self.schedule()
+
+    def schedule(self):
+        if self.scheduled is None:
+            self.scheduled = self.root.after(self.interval_ms, self.flush)
+
+    def flush(self):
+        """Apply all pending updates now"""
+        if self.scheduled is not None:
+            self.root.after_cancel(self.scheduled)
+            self.scheduled = None
+        pending, self.pending = self.pending, {}
+        for key, (apply, value, options) in pending.items():
+            try:
+                if options:
+                    # Only pass the options that differ from what the widget already shows
+                    applied = self.applied.setdefault(key, {})
+                    changed = {
+                        name: option for name, option in value.items()
+                        if name not in applied or applied[name] != option
+                    }
+                    if changed:
+                        apply(**changed)
+                        applied.update(changed)
+                elif key not in self.applied or self.applied[key] != value:
+                    apply(value)
+                    self.applied[key] = value
+            except Exception as e:
+                logger.error(f"Error applying UI update: {str(e)}")
+
+    def cancel(self):
+        """Drop all pending updates"""
+        if self.scheduled is not None:
+            self.root.after_cancel(self.scheduled)
+            self.scheduled = None
+        self.pending.clear()
@@ -0,0 +1,179 @@
+"""
+On-demand cProfile and tracemalloc profiling of the translate pipeline
+"""
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Number of runs to profile, overriding the profile_runs setting
+PROFILE_ENV = "HOVERTRANSLATOR_PROFILE"
+DEFAULT_PROFILE_DIR = os.path.join(os.path.expanduser("~"), ".hovertranslator", "profiles")
+
+
+class NullRun:
+    """Stand-in for a ProfileRun when profiling is off"""
+    def stage(self, name):
+        return nullcontext()
+
+    def profiled(self, function):
+        return function
+
+
+NULL_RUN = NullRun()
+
+# Leave the profiler's own allocations out of the snapshots
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+
+def take_snapshot():
+    return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+
+class ProfileRun:
+    """Profile of one pipeline run, split into named stages
+
+    cProfile only sees the thread that enables it, so work a stage hands to
+    worker threads must be submitted wrapped in ``profiled`` to show up in
+    the stage's profile.
+    """
+    def __init__(self, profiler, number):
+        self.profiler = profiler
+        self.number = number
+        self.name = f"{datetime.now():%Y%m%d-%H%M%S}-run{number}"
+        self.stages = []
+        self.worker_profiles = []
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Profile the code in the block, and wrapped worker calls it makes, as one stage of the run"""
+        profile = cProfile.Profile()
+        with self.lock:
+            self.worker_profiles = []
+        before = take_snapshot()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed = time.perf_counter() - start
+            after = take_snapshot()
+            with self.lock:
+                profiles = [profile] + self.worker_profiles
+                self.worker_profiles = []
+            self.stages.append((name, elapsed, profiles, after.compare_to(before, "lineno")))
+
+    def profiled(self, function):
+        """Wrap a function run on a worker thread so its calls count towards the current stage"""
+        def run(*args, **kwargs):
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profile.disable()
+                with self.lock:
+                    self.worker_profiles.append(profile)
+        return run
+
+    def write(self):
+        """Write a ``.prof`` file per stage and a text summary of the run"""
+        directory = self.profiler.output_dir
+        top = self.profiler.top
+        summary = io.StringIO()
+        summary.write(f"Profile {self.name}\n")
+        for name, elapsed, profiles, allocations in self.stages:
+            stats = pstats.Stats(*profiles, stream=summary)
+            stats.dump_stats(os.path.join(directory, f"{self.name}-{name}.prof"))
+            summary.write(f"\n=== {name}: {elapsed * 1000:.1f} ms ===\n")
+            stats.sort_stats("cumulative").print_stats(top)
+            summary.write(f"Top {top} allocation sites:\n")
+            for stat in allocations[:top]:
+                summary.write(f"{stat}\n")
+
+        path = os.path.join(directory, f"{self.name}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(summary.getvalue())
+        logger.info(f"Wrote pipeline profile to {path}")
+
+
+class PipelineProfiler:
+    """Profiles the next ``runs`` pipeline runs with cProfile and tracemalloc
+
+    Each run writes a timestamped ``.prof`` file per stage (viewable with
+    pstats or snakeviz) and a summary with the stage times, the ``top``
+    functions by cumulative time and the ``top`` allocation sites per stage.
+    """
+    def __init__(self, runs=0, output_dir=None, top=20):
+        self.remaining = runs
+        self.output_dir = output_dir or DEFAULT_PROFILE_DIR
+        self.top = top
+        self.count = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Create a profiler from the settings, letting the environment override the run count"""
+        runs = os.getenv(PROFILE_ENV) or settings.get("profile_runs", 0)
+        try:
+            runs = int(runs)
+        except ValueError:
+            logger.warning(f"Ignoring invalid profile run count: {runs}")
+            runs = 0
+        return cls(runs, settings.get("profile_dir"))
+
+    @property
+    def active(self):
+        return self.remaining > 0
+
+    def arm(self, runs):
+        """Profile the next ``runs`` runs"""
+        with self.lock:
+            self.remaining = runs
+
+    @contextmanager
+    def run(self):
+        """Profile one pipeline run if any profiled runs are left
+
+        Yields a ProfileRun, or a NullRun that does nothing when profiling is
+        off, so callers can always wrap their stages.
+        """
+        with self.lock:
+            if self.remaining <= 0:
+                profiled = False
+            else:
+                self.remaining -= 1
+                self.count += 1
+                profiled = True
+                number = self.count
+        if not profiled:
+            yield NULL_RUN
+            return
+
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        run = ProfileRun(self, number)
+        try:
+            yield run
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            try:
+                os.makedirs(self.output_dir, exist_ok=True)
+                run.write()
+            except Exception as e:
+                logger.error(f"Error writing profile: {str(e)}")
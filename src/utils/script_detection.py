@@ -0,0 +1,48 @@
+"""
+Unicode script classification helpers
+"""
+from collections import Counter
+
+# (first, last, script) code point ranges, checked in order
+SCRIPT_RANGES = (
+    (0x3040, 0x30FF, "kana"),
+    (0x31F0, 0x31FF, "kana"),
+    (0xFF66, 0xFF9F, "kana"),
+    (0x1100, 0x11FF, "hangul"),
+    (0x3130, 0x318F, "hangul"),
+    (0xAC00, 0xD7AF, "hangul"),
+    (0x3400, 0x4DBF, "han"),
+    (0x4E00, 0x9FFF, "han"),
+    (0xF900, 0xFAFF, "han"),
+    (0x0400, 0x04FF, "cyrillic"),
+    (0x0E00, 0x0E7F, "thai"),
+    (0x0600, 0x06FF, "arabic"),
+)
+
+
+def char_script(char):
+    """Get the script of a character, or None for digits, punctuation and spaces"""
+    if char.isascii():
+        return "latin" if char.isalpha() else None
+    code = ord(char)
+    for first, last, script in SCRIPT_RANGES:
+        if first <= code <= last:
+            return script
+    if char.isalpha():
+        return "latin" if code < 0x0250 else "other"
+    return None
+
+
+def script_profile(text):
+    """Count the letters of each script in text"""
+    return Counter(script for script in map(char_script, text) if script)
+
+
+def dominant_script(text):
+    """Get the most common script in text, treating kana with kanji as Japanese"""
+    profile = script_profile(text)
+    if not profile:
+        return None
+    if profile["kana"]:
+        return "kana"
+    return profile.most_common(1)[0][0]
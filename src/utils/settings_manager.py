@@ -34,6 +34,15 @@ class SettingsManager:
             logger.error(f"Error loading settings: {str(e)}")
             return settings
             
+    def update_settings(self, **values):
+        """Change individual settings in the settings file, keeping the others as saved"""
+        settings = {}
+        if os.path.exists(self.settings_file):
+            with open(self.settings_file, "r") as f:
+                settings = json.load(f)
+        settings.update(values)
+        self.save_settings(settings)
+            
     def save_settings(self, settings):
         """Save settings to file"""
         try:
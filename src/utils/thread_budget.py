@@ -0,0 +1,136 @@
+"""
+CPU thread budget shared by torch, ONNX Runtime and the pipeline's worker pools
+"""
+import logging
+import os
+import sys
+import time
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ThreadBudget:
+    """How many threads each part of the pipeline may use"""
+    ocr_threads: int
+    interop_threads: int
+    translation_workers: int
+    fanout_workers: int
+    ocr_cores: tuple = ()
+
+
+def plan_thread_budget(total_threads=0, ocr_cores=None, reserved_threads=1, max_ocr_threads=8):
+    """Split ``total_threads`` (0 for all cores) between OCR and the rest of the app
+
+    ``reserved_threads`` are left for the UI and capture. OCR gets the rest,
+    up to ``max_ocr_threads`` since the small capture images stop scaling
+    well beyond that (``autotune_ocr_threads`` finds the best count for a
+    machine), or one thread per pinned core when ``ocr_cores`` is given.
+    Translation workers mostly wait on the network, so their pools stay
+    small and fixed.
+    """
+    total = total_threads or os.cpu_count() or 1
+    ocr_cores = tuple(ocr_cores or ())
+    if ocr_cores:
+        ocr_threads = len(ocr_cores)
+    else:
+        ocr_threads = max(1, min(total - reserved_threads, max_ocr_threads))
+    return ThreadBudget(
+        ocr_threads=ocr_threads,
+        interop_threads=1,
+        translation_workers=2,
+        fanout_workers=4,
+        ocr_cores=ocr_cores
+    )
+
+
+def apply_torch_threads(intra_op_threads, inter_op_threads=0):
+    """Set torch's intra- and inter-op thread counts; 0 keeps torch's default
+
+    The inter-op count can only be set before torch runs any parallel work,
+    so a late call leaves it unchanged.
+    """
+    import torch
+
+    if intra_op_threads:
+        torch.set_num_threads(intra_op_threads)
+    if inter_op_threads:
+        try:
+            torch.set_num_interop_threads(inter_op_threads)
+        except RuntimeError as e:
+            logger.warning(f"Could not set torch inter-op threads: {str(e)}")
+    logger.info(f"torch using {torch.get_num_threads()} intra-op and {torch.get_num_interop_threads()} inter-op threads")
+
+
+def pin_to_cores(cores):
+    """Restrict the calling thread to the given CPU cores
+
+    Only the calling thread is pinned, along with the threads it starts
+    later, such as torch's OpenMP pool. That needs Linux's per-thread
+    ``sched_setaffinity``; elsewhere nothing is pinned rather than
+    restricting the whole process. Returns True if the affinity was set.
+    """
+    if not cores:
+        return False
+    if not hasattr(os, "sched_setaffinity"):
+        logger.warning("Per-thread CPU affinity is not supported on this platform, not pinning OCR")
+        return False
+    try:
+        os.sched_setaffinity(0, cores)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not pin to cores {cores}: {str(e)}")
+        return False
+    logger.info(f"Pinned OCR worker to cores {list(cores)}")
+    return True
+
+
+def autotune_ocr_threads(ocr_service, image, source_lang="Japanese", candidates=None, repeats=3, tolerance=0.05):
+    """Benchmark OCR on ``image`` with different torch thread counts
+
+    Returns ``(best, timings)`` where ``timings`` maps thread counts to their
+    mean latency. The smallest count within ``tolerance`` of the fastest
+    wins, leaving the remaining cores to the rest of the machine.
+    """
+    import torch
+
+    cores = os.cpu_count() or 1
+    if candidates is None:
+        candidates = sorted({1, 2, 4, 6, 8, 12, 16, cores} & set(range(1, cores + 1)))
+    original = torch.get_num_threads()
+    timings = {}
+    try:
+        for threads in candidates:
+            torch.set_num_threads(threads)
+            ocr_service.detection_cache.clear()
+            ocr_service.perform_structured_ocr(image, source_lang)
+            elapsed = 0.0
+            for _ in range(repeats):
+                # The detection cache would hide repeated detection work
+                ocr_service.detection_cache.clear()
+                start = time.perf_counter()
+                ocr_service.perform_structured_ocr(image, source_lang)
+                elapsed += time.perf_counter() - start
+            timings[threads] = elapsed / repeats
+            logger.info(f"{threads} threads: {timings[threads] * 1000:.0f} ms")
+    finally:
+        torch.set_num_threads(original)
+
+    fastest = min(timings.values())
+    best = min(threads for threads, seconds in timings.items() if seconds <= fastest * (1 + tolerance))
+    logger.info(f"Best OCR thread count: {best}")
+    return best, timings
+
+
+if __name__ == "__main__":
+    import cv2
+    from services.ocr_service import OCRService
+    from utils.settings_manager import SettingsManager
+
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) < 2:
+        print("Usage: python -m utils.thread_budget IMAGE [SOURCE_LANGUAGE]")
+        sys.exit(1)
+    best, _ = autotune_ocr_threads(OCRService(), cv2.imread(sys.argv[1]), *sys.argv[2:3])
+    SettingsManager().update_settings(ocr_intra_op_threads=best)
+    logger.info(f"Saved ocr_intra_op_threads = {best}")